@@ -0,0 +1,33 @@
+"""prefix indexes for autocomplete
+
+Revision ID: 3c9e7a1f2b6d
+Revises: 8f1d2c3b4a5e
+Create Date: 2026-10-19 15:02:17.481920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e7a1f2b6d'
+down_revision: Union[str, Sequence[str], None] = '8f1d2c3b4a5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large catalogs keep accepting writes meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_books_title_key_prefix', 'books', [sa.text('title_key COLLATE "C"')], postgresql_concurrently=True)
+        op.create_index('ix_romancists_name_key_prefix', 'romancists', [sa.text('name_key COLLATE "C"')], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_romancists_name_key_prefix', table_name='romancists', postgresql_concurrently=True)
+        op.drop_index('ix_books_title_key_prefix', table_name='books', postgresql_concurrently=True)
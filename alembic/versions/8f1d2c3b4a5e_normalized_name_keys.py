@@ -0,0 +1,53 @@
+"""normalized name keys
+
+Revision ID: 8f1d2c3b4a5e
+Revises: 45c3dfd137c7
+Create Date: 2026-10-19 09:12:41.218334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1d2c3b4a5e'
+down_revision: Union[str, Sequence[str], None] = '45c3dfd137c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('title_key', sa.String(), nullable=True))
+    op.add_column('romancists', sa.Column('name_key', sa.String(), nullable=True))
+
+    # Backfill with the same normalization as app.utils.sanitize.sanitize_name
+    op.execute("UPDATE books SET title_key = lower(regexp_replace(btrim(title), '\\s+', ' ', 'g'))")
+    op.execute("UPDATE romancists SET name_key = lower(regexp_replace(btrim(name), '\\s+', ' ', 'g'))")
+
+    op.alter_column('books', 'title_key', nullable=False)
+    op.alter_column('romancists', 'name_key', nullable=False)
+
+    op.create_index(op.f('ix_books_title_key'), 'books', ['title_key'], unique=True)
+    op.create_index(op.f('ix_romancists_name_key'), 'romancists', ['name_key'], unique=True)
+
+    # Uniqueness now lives on the normalized keys
+    op.drop_constraint('books_title_key', 'books', type_='unique')
+    op.drop_constraint('romancists_name_key', 'romancists', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE books SET title = title_key")
+    op.execute("UPDATE romancists SET name = name_key")
+
+    op.create_unique_constraint('romancists_name_key', 'romancists', ['name'])
+    op.create_unique_constraint('books_title_key', 'books', ['title'])
+
+    op.drop_index(op.f('ix_romancists_name_key'), table_name='romancists')
+    op.drop_index(op.f('ix_books_title_key'), table_name='books')
+
+    op.drop_column('romancists', 'name_key')
+    op.drop_column('books', 'title_key')
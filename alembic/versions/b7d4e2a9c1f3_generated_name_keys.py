@@ -0,0 +1,59 @@
+"""generated name keys
+
+Revision ID: b7d4e2a9c1f3
+Revises: 3c9e7a1f2b6d
+Create Date: 2026-10-19 18:40:05.613207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e2a9c1f3'
+down_revision: Union[str, Sequence[str], None] = '3c9e7a1f2b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same normalization as app.utils.sanitize.sanitize_name
+TITLE_KEY = "lower(btrim(regexp_replace(title, '\\s+', ' ', 'g')))"
+NAME_KEY = "lower(btrim(regexp_replace(name, '\\s+', ' ', 'g')))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A column cannot become generated in place: replace it, which rewrites the
+    # table under an exclusive lock, then rebuild its indexes
+    op.drop_column('books', 'title_key') # Drops ix_books_title_key and ix_books_title_key_prefix too
+    op.drop_column('romancists', 'name_key')
+
+    op.add_column('books', sa.Column('title_key', sa.String(), sa.Computed(sa.text(TITLE_KEY), persisted=True), nullable=False))
+    op.add_column('romancists', sa.Column('name_key', sa.String(), sa.Computed(sa.text(NAME_KEY), persisted=True), nullable=False))
+
+    _create_key_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('books', 'title_key')
+    op.drop_column('romancists', 'name_key')
+
+    op.add_column('books', sa.Column('title_key', sa.String(), nullable=True))
+    op.add_column('romancists', sa.Column('name_key', sa.String(), nullable=True))
+
+    op.execute(f'UPDATE books SET title_key = {TITLE_KEY}')
+    op.execute(f'UPDATE romancists SET name_key = {NAME_KEY}')
+
+    op.alter_column('books', 'title_key', nullable=False)
+    op.alter_column('romancists', 'name_key', nullable=False)
+
+    _create_key_indexes()
+
+
+def _create_key_indexes():
+    op.create_index(op.f('ix_books_title_key'), 'books', ['title_key'], unique=True)
+    op.create_index(op.f('ix_romancists_name_key'), 'romancists', ['name_key'], unique=True)
+    op.create_index('ix_books_title_key_prefix', 'books', [sa.text('title_key COLLATE "C"')])
+    op.create_index('ix_romancists_name_key_prefix', 'romancists', [sa.text('name_key COLLATE "C"')])
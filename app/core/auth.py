@@ -6,10 +6,12 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.security import verify_password
 from app.core.jwt import decode_token
+from app.core.tracing import traced
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/token')
 
+@traced('get_current_user')
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Retrieve the current user based on the provided JWT token."""
     payload = decode_token(token)
@@ -0,0 +1,237 @@
+import logging
+import struct
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, NamedTuple
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.changes import change_counter, subscribe
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    value: bytes
+    stored_at: float
+
+
+class MemoryBackend:
+    """In-process LRU store; entries expire after their retention time."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[CacheEntry, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            item = self._entries.get(key)
+
+            if item is None:
+                return None
+
+            entry, expires_at = item
+
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, retention: float):
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic() + retention)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False) # Evict the least recently used entry
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared store for several workers/hosts. Requires the `redis` extra (`poetry install -E redis`)."""
+
+    KEY_PREFIX = 'madr:cache:'
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND='redis' requires the 'redis' extra: poetry install -E redis") from exc
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> CacheEntry | None:
+        raw = self._client.get(self.KEY_PREFIX + key)
+
+        if raw is None:
+            return None
+
+        # The first 8 bytes hold the wall-clock time the entry was stored
+        (stored_at,) = struct.unpack('d', raw[:8])
+        return CacheEntry(raw[8:], stored_at)
+
+    def set(self, key: str, entry: CacheEntry, retention: float):
+        raw = struct.pack('d', entry.stored_at) + entry.value
+        self._client.set(self.KEY_PREFIX + key, raw, px=max(int(retention * 1000), 1))
+
+    def delete_prefix(self, prefix: str):
+        keys = list(self._client.scan_iter(match=self.KEY_PREFIX + prefix + '*'))
+
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self):
+        self.delete_prefix('')
+
+
+def cache_key(namespace: str, route: str, **params) -> str:
+    """Build a cache key from the route and its normalized query parameters."""
+    query = '&'.join(f'{name}={params[name]}' for name in sorted(params))
+    return f'{namespace}:{route}?{query}'
+
+
+class ResponseCache:
+    """Read-through cache of encoded response bodies with stale-while-revalidate.
+
+    Fresh entries are served directly. Stale entries are served while a
+    background thread refreshes them, and also whenever the database cannot
+    be reached. Keys start with the namespace (resource) they depend on, so
+    writes invalidate them with `invalidate(namespace)`. With `coalesce`,
+    concurrent misses of the same key share a single load.
+    """
+
+    def __init__(
+        self,
+        backend: MemoryBackend | RedisBackend | None,
+        ttl: float,
+        stale: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+        coalesce: SingleFlight | None = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale = stale
+        self.session_factory = session_factory
+        self.coalesce = coalesce
+        self._refreshing: set[str] = set()
+        self._refreshing_lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+
+    def fetch(self, key: str, loader: Callable[[Session], bytes], db: Session) -> bytes:
+        """Return the cached body for `key`, loading it with `loader(db)` on a miss."""
+        if self.backend is None:
+            return self._coalesced(key, lambda: loader(db))
+
+        entry = self.backend.get(key)
+
+        if entry is not None:
+            age = time.time() - entry.stored_at
+
+            if age < self.ttl:
+                return entry.value
+
+            if age < self.ttl + self.stale:
+                self._refresh_in_background(key, loader)
+                return entry.value
+
+        try:
+            return self._coalesced(key, lambda: self._load(key, loader, db))
+        except DBAPIError:
+            if entry is not None:
+                logger.warning('Database unavailable, serving stale cache entry for %s', key)
+                return entry.value
+            raise
+
+    def invalidate(self, namespace: str):
+        """Drop every entry that depends on `namespace`."""
+        if self.backend is not None:
+            self.backend.delete_prefix(f'{namespace}:')
+
+    def clear(self):
+        """Drop every entry."""
+        if self.backend is not None:
+            self.backend.clear()
+
+    def _coalesced(self, key: str, load: Callable[[], bytes]) -> bytes:
+        """Run `load`, sharing it with concurrent misses of the same key."""
+        if self.coalesce is None:
+            return load()
+
+        # Callers arriving after a write must not join a load that started before it
+        namespace = key.split(':', 1)[0]
+        return self.coalesce.do(f'{key}@{change_counter.version(namespace)}', load)
+
+    def _load(self, key: str, loader: Callable[[Session], bytes], db: Session) -> bytes:
+        """Run the loader and store its result unless a write landed meanwhile."""
+        namespace = key.split(':', 1)[0]
+        version = change_counter.version(namespace)
+
+        value = loader(db)
+
+        # A write committed while loading; the value may already be outdated
+        if change_counter.version(namespace) == version:
+            self.backend.set(key, CacheEntry(value, time.time()), self.ttl + self.stale)
+
+        return value
+
+    def _refresh_in_background(self, key: str, loader: Callable[[Session], bytes]):
+        """Schedule a refresh of `key` unless one is already running."""
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        self._executor.submit(self._refresh, key, loader)
+
+    def _refresh(self, key: str, loader: Callable[[Session], bytes]):
+        db = self.session_factory()
+        try:
+            self._load(key, loader, db)
+        except Exception:
+            logger.exception('Background refresh failed for %s', key)
+        finally:
+            db.close()
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+
+
+def create_backend() -> MemoryBackend | RedisBackend | None:
+    """Build the cache backend selected in the settings."""
+    if settings.CACHE_BACKEND == 'none':
+        return None
+
+    if settings.CACHE_BACKEND == 'redis':
+        return RedisBackend(settings.CACHE_URL)
+
+    return MemoryBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(
+    backend=create_backend(),
+    ttl=settings.CACHE_TTL_SECONDS,
+    stale=settings.CACHE_STALE_SECONDS,
+    coalesce=SingleFlight(settings.COALESCE_TIMEOUT_SECONDS) if settings.COALESCE_READS else None,
+)
+
+
+@subscribe
+def _invalidate_on_change(resource: str, ids: tuple[int, ...]):
+    """Drop cached responses that depend on a resource that was written."""
+    response_cache.invalidate(resource)
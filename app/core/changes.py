@@ -0,0 +1,101 @@
+import json
+import os
+from collections import defaultdict
+from threading import Lock
+from typing import Callable
+from uuid import uuid4
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Postgres rejects NOTIFY payloads above 8000 bytes
+NOTIFY_IDS_PER_MESSAGE = 500
+
+
+class ChangeCounter:
+    """Per-resource change counters used to version catalog responses.
+
+    The epoch is unique per process and tags the change notifications it
+    sends, so each worker can skip its own. It is drawn again in every forked
+    child: workers forked from a preloaded master would otherwise share it
+    and drop each other's notifications.
+    """
+
+    def __init__(self):
+        self._versions = defaultdict(int)
+        self._lock = Lock()
+        self.reseed()
+
+    def reseed(self):
+        """Draw a new epoch for this process."""
+        self.epoch = f'{os.getpid()}.{uuid4().hex[:8]}'
+
+    def version(self, resource: str) -> int:
+        """Return the current version of a resource."""
+        return self._versions[resource]
+
+    def bump(self, resource: str) -> int:
+        """Advance the version of a resource and return the new value."""
+        with self._lock:
+            self._versions[resource] += 1
+            return self._versions[resource]
+
+
+change_counter = ChangeCounter()
+
+os.register_at_fork(after_in_child=change_counter.reseed)
+
+# Callbacks run for every committed change, e.g. cache invalidation
+_subscribers: list[Callable[[str, tuple[int, ...]], None]] = []
+
+
+def subscribe(callback: Callable[[str, tuple[int, ...]], None]):
+    """Register a callback invoked as `callback(resource, ids)` after each committed change."""
+    _subscribers.append(callback)
+    return callback
+
+
+def record_change(db: Session, resource: str, *ids: int):
+    """Register a write to `resource` that becomes visible when `db` commits.
+
+    Write routes call this before `db.commit()`; nothing is applied if the
+    transaction rolls back. On Postgres the change is also published with
+    NOTIFY inside the same transaction, so other workers only hear about it
+    once it is committed.
+    """
+    db.info.setdefault('pending_changes', []).append((resource, ids))
+
+    if settings.CHANGE_NOTIFY and db.get_bind().dialect.name == 'postgresql':
+        publish_change(db, resource, ids)
+
+
+def publish_change(db: Session, resource: str, ids: tuple[int, ...]):
+    """Queue NOTIFY messages describing a change in the current transaction."""
+    chunks = [ids[i:i + NOTIFY_IDS_PER_MESSAGE] for i in range(0, len(ids), NOTIFY_IDS_PER_MESSAGE)] or [()]
+
+    for chunk in chunks:
+        payload = json.dumps({'origin': change_counter.epoch, 'resource': resource, 'ids': list(chunk)})
+        db.execute(select(func.pg_notify(settings.CHANGE_NOTIFY_CHANNEL, payload)))
+
+
+def apply_change(resource: str, ids: tuple[int, ...] = ()):
+    """Apply a committed change to the in-process state."""
+    change_counter.bump(resource)
+
+    for callback in _subscribers:
+        callback(resource, ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_changes(session: Session):
+    """Apply the changes recorded on a session once its transaction commits."""
+    for resource, ids in session.info.pop('pending_changes', []):
+        apply_change(resource, ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_changes(session: Session):
+    """Forget the changes recorded on a session whose transaction rolled back."""
+    session.info.pop('pending_changes', None)
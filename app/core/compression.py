@@ -0,0 +1,185 @@
+import gzip
+import time
+from http import HTTPStatus
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import CacheEntry, MemoryBackend
+
+try:
+    import brotli # Optional, better ratio than gzip for JSON
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+# How long compressed bodies of ETag-tagged responses are kept for reuse
+PRECOMPRESSED_RETENTION_SECONDS = 300.0
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick the best supported encoding accepted by the client."""
+    accepted = set()
+
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = params.strip().removeprefix('q=') if params.strip().startswith('q=') else '1'
+
+        try:
+            if float(q) > 0:
+                accepted.add(coding.strip().lower())
+        except ValueError:
+            continue
+
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+
+    if 'gzip' in accepted:
+        return 'gzip'
+
+    return None
+
+
+def tag_etag(etag: str, encoding: str) -> str:
+    """Derive the ETag of an encoded representation: `"abc"` -> `"abc-gzip"`."""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+class CompressionMiddleware:
+    """Compress buffered JSON/text responses with brotli (if installed) or gzip.
+
+    Bodies smaller than `minimum_size` and streaming responses are sent as
+    is. Bodies of `thread_min_size` bytes or more are compressed in a worker
+    thread so the event loop keeps serving other requests meanwhile.
+    Compressed bodies of responses carrying an ETag are kept in a small
+    LRU, so hot cached responses are not compressed again on every hit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 5,
+        max_level: int = 6,
+        max_entries: int = 256,
+        thread_min_size: int = 64 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.gzip_level = max(1, min(level, max_level, 9))
+        self.brotli_quality = max(0, min(level, max_level, 11))
+        self.compressed = MemoryBackend(max_entries=max_entries)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get('accept-encoding', ''))
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        chunks: list[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message['type'] == 'http.response.start':
+                if message['status'] == HTTPStatus.NOT_MODIFIED:
+                    self._tag_not_modified(message, request_headers.get('if-none-match', ''), encoding)
+                    passthrough = True
+                    await send(message)
+                    return
+
+                start_message = message
+                return
+
+            chunks.append(message.get('body', b''))
+
+            if message.get('more_body', False):
+                # Streaming responses are not buffered
+                passthrough = True
+                await send(start_message)
+                for chunk in chunks[:-1]:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                await send(message)
+                return
+
+            await self._send_buffered(send, start_message, b''.join(chunks), encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_buffered(self, send: Send, start_message: Message, body: bytes, encoding: str):
+        headers = MutableHeaders(scope=start_message)
+        content_type = headers.get('content-type', '')
+
+        if not content_type.startswith(COMPRESSIBLE_TYPES) or 'content-encoding' in headers:
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        headers.add_vary_header('Accept-Encoding')
+
+        if len(body) < self.minimum_size:
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        etag = headers.get('etag')
+        compressed = await self._compress_cached(body, encoding, etag) if etag else await self._compress(body, encoding)
+
+        headers['Content-Encoding'] = encoding
+        headers['Content-Length'] = str(len(compressed))
+
+        if etag:
+            headers['ETag'] = tag_etag(etag, encoding)
+
+        await send(start_message)
+        await send({'type': 'http.response.body', 'body': compressed})
+
+    def _tag_not_modified(self, message: Message, if_none_match: str, encoding: str):
+        # A 304 must repeat the ETag the client cached, which for a compressed
+        # representation carries the encoding suffix
+        headers = MutableHeaders(scope=message)
+        etag = headers.get('etag')
+
+        if etag and tag_etag(etag, encoding) in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]:
+            headers['ETag'] = tag_etag(etag, encoding)
+            headers.add_vary_header('Accept-Encoding')
+
+    async def _compress_cached(self, body: bytes, encoding: str, etag: str) -> bytes:
+        # The body hash guards against a body that changed under the same ETag
+        key = f'{etag}:{encoding}:{hash(body)}'
+        entry = self.compressed.get(key)
+
+        if entry is not None:
+            return entry.value
+
+        compressed = await self._compress(body, encoding)
+        self.compressed.set(key, CacheEntry(compressed, time.time()), PRECOMPRESSED_RETENTION_SECONDS)
+
+        return compressed
+
+    async def _compress(self, body: bytes, encoding: str) -> bytes:
+        if len(body) >= self.thread_min_size:
+            return await anyio.to_thread.run_sync(self._compress_sync, body, encoding)
+
+        return self._compress_sync(body, encoding)
+
+    def _compress_sync(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
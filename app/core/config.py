@@ -8,6 +8,79 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
 
+    # Response cache for catalog reads: 'memory', 'redis' or 'none'
+    CACHE_BACKEND: str = 'memory'
+    CACHE_URL: str | None = None # Required by the 'redis' backend (install the 'redis' extra)
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: float = 30.0
+    CACHE_STALE_SECONDS: float = 300.0 # Extra time a stale entry may be served
+
+    # Concurrent identical reads share one database execution
+    COALESCE_READS: bool = True
+    COALESCE_TIMEOUT_SECONDS: float = 5.0 # After this, waiting requests run the query themselves
+
+    # Negative lookup cache for ids that do not exist
+    NEGATIVE_CACHE_TTL_SECONDS: float = 5.0
+    NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+    ID_RANGE_FILTER: bool = True # Treat ids above max(id) as missing
+    ID_RANGE_REFRESH_SECONDS: float = 60.0
+
+    # Publish committed changes with Postgres NOTIFY so every worker evicts its caches
+    CHANGE_NOTIFY: bool = True
+    CHANGE_NOTIFY_CHANNEL: str = 'madr_changes'
+
+    # How list endpoints build their body: 'orm' (Pydantic models), 'fast' (plain rows)
+    # or 'db_json' (the database aggregates the JSON body)
+    BOOKS_LIST_MODE: str = 'fast'
+    ROMANCISTS_LIST_MODE: str = 'fast'
+    MULTI_GET_MAX_IDS: int = 100 # Most ids accepted by one `?ids=1,2,3` request
+    BULK_MAX_BOOKS: int = 1000 # Most books one bulk update or delete may touch
+
+    # Autocomplete: prefix matches from the database, or from sorted in-memory keys per worker
+    AUTOCOMPLETE_MEMORY_INDEX: bool = False
+    AUTOCOMPLETE_MAX_RESULTS: int = 20
+
+    # Response compression (gzip, or brotli when installed)
+    COMPRESSION_MIN_SIZE: int = 1024 # Bytes; smaller bodies are sent as is
+    COMPRESSION_LEVEL: int = 5
+    COMPRESSION_MAX_LEVEL: int = 6 # Cap to keep compression CPU bounded
+    COMPRESSION_THREAD_MIN_SIZE: int = 65536 # Bytes; larger bodies are compressed off the event loop
+
+    # Statement timeouts in milliseconds (0 = none), per route by endpoint name
+    DB_STATEMENT_TIMEOUT_MS: int = 10000
+    DB_ROUTE_TIMEOUTS_MS: dict[str, int] = {'read_books': 3000, 'read_romancists': 3000, 'autocomplete': 500}
+    DEADLINE_HEADER: str = 'X-Request-Timeout-Ms' # Lets clients narrow the budget
+
+    # Load shedding: reject with 503 + Retry-After instead of queueing (0 disables)
+    LOAD_SHED_MAX_IN_FLIGHT: int = 64 # Per worker
+    LOAD_SHED_WRITE_RESERVE: int = 16 # Extra slots for authenticated writes
+    LOAD_SHED_MAX_POOL_WAIT_MS: float = 200.0 # Average DB pool checkout wait that counts as saturated
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 1
+
+    # Readiness: background DB check instead of a query per probe
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    READY_MAX_POOL_WAIT_MS: float = 500.0 # Not ready while pool waits average more than this
+
+    # Query instrumentation
+    SERVER_TIMING: bool = True # Report query count and DB time in a Server-Timing header
+    SLOW_QUERY_MS: float = 500.0 # Log statements slower than this (0 disables)
+    N_PLUS_ONE_MODE: str = 'off' # 'off', 'warn' or 'raise' when a statement repeats in a request
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Tracing: 'none', 'file' (JSON lines) or 'otlp' (OTLP/HTTP JSON collector)
+    TRACING_EXPORTER: str = 'none'
+    TRACING_SAMPLE_RATE: float = 0.01 # Share of requests traced when the caller sent no traceparent
+    TRACING_FILE: str = 'traces.jsonl'
+    TRACING_ENDPOINT: str = 'http://localhost:4318/v1/traces'
+    TRACING_SERVICE_NAME: str = 'madr-api'
+
+    # On-demand profiler, only installed when a secret is set (sent as X-Profile-Token)
+    PROFILING_SECRET: str = ''
+
     model_config = ConfigDict(env_file='.env')
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
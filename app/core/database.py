@@ -1,19 +1,170 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import re
+import time
+from contextvars import ContextVar
+from threading import Lock
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.deadlines import request_budget_ms
+from app.core.tracing import SPAN_KIND_CLIENT, start_span
 from app.models.base import Base
 
 DATABASE_URL = f'postgresql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}'
 
-engine = create_engine(DATABASE_URL)
+
+class PoolStats:
+    """Live view of connection pool pressure: callers waiting and average wait."""
+
+    def __init__(self, smoothing: float = 0.2):
+        self.smoothing = smoothing
+        self.waiting = 0
+        self.average_wait = 0.0 # Seconds, exponentially weighted
+        self._lock = Lock()
+
+    def checkout_started(self):
+        with self._lock:
+            self.waiting += 1
+
+    def checkout_finished(self, seconds: float):
+        with self._lock:
+            self.waiting -= 1
+            self.average_wait += self.smoothing * (seconds - self.average_wait)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait for a connection."""
+
+    def __init__(self, creator, stats: PoolStats | None = None, **kwargs):
+        self.stats = stats or PoolStats()
+        super().__init__(creator, **kwargs)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        self.stats.checkout_started()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.checkout_finished(time.perf_counter() - started)
+
+
+class RepeatedQueryError(RuntimeError):
+    """The same statement ran too many times in one request (likely N+1)."""
+
+
+class QueryStats:
+    """Statements run by the current request."""
+
+    __slots__ = ('count', 'seconds', 'repeats')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.repeats: dict[str, int] = {} # Statement text -> executions
+
+
+# Set per request by ServerTimingMiddleware; threadpool endpoints inherit it with the context
+current_queries: ContextVar[QueryStats | None] = ContextVar('current_queries', default=None)
+
+slow_query_logger = logging.getLogger('app.slow_queries')
+logger = logging.getLogger(__name__)
+
+_PARAMETERS = re.compile(r'%\(\w+\)s|%s|\?')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement shape: parameters and literals become `?`, value lists `(...)`."""
+    sql = _LITERALS.sub('?', _PARAMETERS.sub('?', statement))
+    return ' '.join(_VALUE_LISTS.sub('(...)', sql).split())
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+    conn.info['query_span'] = start_span('db.query', SPAN_KIND_CLIENT)
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started']
+    query_span = conn.info.pop('query_span', None)
+
+    if query_span is not None:
+        query_span.attributes['db.statement'] = normalize_sql(statement)
+        query_span.end()
+
+    if 0 < settings.SLOW_QUERY_MS <= elapsed * 1000:
+        slow_query_logger.warning('Slow query (%.1f ms): %s', elapsed * 1000, normalize_sql(statement))
+
+    stats = current_queries.get()
+
+    if stats is None:
+        return
+
+    stats.count += 1
+    stats.seconds += elapsed
+
+    if settings.N_PLUS_ONE_MODE != 'off':
+        _check_repeats(stats, statement)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _query_failed(context):
+    query_span = context.connection.info.pop('query_span', None) if context.connection is not None else None
+
+    if query_span is not None:
+        query_span.error = type(context.original_exception).__name__
+        query_span.end()
+
+
+def _check_repeats(stats: QueryStats, statement: str):
+    """Report a statement the first time it reaches the repeat threshold."""
+    # Bound parameters keep the text identical across lazy loads of different rows
+    repeats = stats.repeats[statement] = stats.repeats.get(statement, 0) + 1
+
+    if repeats != settings.N_PLUS_ONE_THRESHOLD:
+        return
+
+    message = f'Statement ran {repeats} times in one request (possible N+1): {normalize_sql(statement)}'
+
+    if settings.N_PLUS_ONE_MODE == 'raise':
+        raise RepeatedQueryError(message)
+
+    logger.warning(message)
+
+
+pool_stats = PoolStats()
+
+engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, stats=pool_stats)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base.metadata.create_all(bind=engine)
 
-def get_db():
+@event.listens_for(Session, 'after_begin')
+def _apply_statement_timeout(session, transaction, connection):
+    """Bound every statement of the transaction by the session's budget."""
+    timeout_ms = session.info.get('statement_timeout_ms')
+
+    if timeout_ms and connection.dialect.name == 'postgresql':
+        # SET LOCAL ends with the transaction, so pooled connections are not affected
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
+
+def get_db(request: Request):
     db = SessionLocal()
+    db.info['statement_timeout_ms'] = request_budget_ms(request)
     try:
         yield db
     finally:
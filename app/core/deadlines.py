@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+
+# SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = '57014'
+
+
+def request_budget_ms(request: Request) -> int | None:
+    """Latency budget of the request's database statements, in milliseconds.
+
+    The budget comes from DB_ROUTE_TIMEOUTS_MS for the matched route (by
+    endpoint name) or DB_STATEMENT_TIMEOUT_MS, and the client may narrow it
+    with the deadline header. It is never widened by the client.
+    """
+    route = request.scope.get('route')
+    budget = settings.DB_ROUTE_TIMEOUTS_MS.get(getattr(route, 'name', None), settings.DB_STATEMENT_TIMEOUT_MS)
+
+    requested = request.headers.get(settings.DEADLINE_HEADER)
+
+    if requested is not None and requested.isdigit() and int(requested) > 0:
+        budget = min(budget, int(requested)) if budget else int(requested)
+
+    return budget or None
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, 'pgcode', None) == QUERY_CANCELED
+
+
+async def statement_timeout_handler(request: Request, exc: DBAPIError):
+    """Turn a statement cancelled by its budget into 504; other errors stay 500."""
+    if not is_statement_timeout(exc):
+        raise exc
+
+    return JSONResponse(status_code=HTTPStatus.GATEWAY_TIMEOUT, content={'detail': 'Request took longer than its time budget'})
@@ -0,0 +1,41 @@
+import hashlib
+
+from fastapi import Request
+
+# Content codings appended to the ETag by the compression middleware
+ENCODING_SUFFIXES = ('gzip', 'br')
+
+
+def compute_etag(body: bytes) -> str:
+    """Build a strong ETag from the response body.
+
+    Hashing the content, rather than keeping a version number, gives every
+    worker the same ETag for the same data, and any write that changes the
+    data changes it, whichever process or tool made the write.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+
+    # Compressed representations carry the encoding as a suffix, e.g. "abc-gzip"
+    accepted = {etag} | {f'{etag[:-1]}-{encoding}"' for encoding in ENCODING_SUFFIXES}
+
+    return any(candidate in accepted for candidate in candidates)
+
+
+def conditional_get(request: Request) -> str:
+    """Dependency of routes answering conditional GETs: the If-None-Match header, or ''.
+
+    Pass it to `json_response`, which tags the body with its ETag and answers
+    `304 Not Modified` on a match.
+    """
+    return request.headers.get('if-none-match', '')
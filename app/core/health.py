@@ -0,0 +1,110 @@
+import logging
+import time
+from threading import Event, Thread
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import DATABASE_URL, PoolStats, pool_stats
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Check the database in the background so probes never touch the pool.
+
+    A thread runs `SELECT 1` every `interval` seconds on its own engine (one
+    connection, outside the application pool) and keeps the result.
+    Readiness combines that result, its age and the saturation of the
+    application pool, so an overloaded worker is taken out of rotation.
+    """
+
+    def __init__(self, engine: Engine, pool_stats: PoolStats, interval: float = 5.0, max_pool_wait: float = 0.5):
+        self.engine = engine
+        self.pool_stats = pool_stats
+        self.interval = interval
+        self.max_pool_wait = max_pool_wait
+        self.database_ok = False
+        self.error: str | None = 'not checked yet'
+        self.checked_at = 0.0 # time.monotonic() of the last check
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='health-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def check(self):
+        """Run one database check and record its outcome."""
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as exc:
+            if self.database_ok:
+                logger.warning('Database health check failed: %s', exc)
+
+            lines = str(exc).strip().splitlines()
+            self.database_ok = False
+            self.error = lines[0] if lines else type(exc).__name__
+        else:
+            self.database_ok = True
+            self.error = None
+
+        self.checked_at = time.monotonic()
+
+    def readiness(self) -> tuple[bool, dict]:
+        """Whether this worker should receive traffic, and why not."""
+        problems = []
+
+        if not self.database_ok:
+            problems.append(f'database unavailable: {self.error}')
+        elif time.monotonic() - self.checked_at > 3 * self.interval:
+            problems.append('database check is stale')
+
+        if self.pool_stats.waiting > 0 and self.pool_stats.average_wait > self.max_pool_wait:
+            problems.append('connection pool saturated')
+
+        return not problems, {
+            'status': 'ready' if not problems else 'not ready',
+            'database': 'ok' if self.database_ok else 'unavailable',
+            'pool_waiting': self.pool_stats.waiting,
+            'pool_wait_ms': round(self.pool_stats.average_wait * 1000, 1),
+            'problems': problems,
+        }
+
+    def _run(self):
+        while True:
+            self.check()
+
+            if self._stop.wait(self.interval):
+                return
+
+
+def create_health_monitor() -> HealthMonitor:
+    """Monitor with a dedicated single-connection engine and short timeouts."""
+    timeout = settings.HEALTH_CHECK_TIMEOUT_SECONDS
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=timeout,
+        connect_args={'connect_timeout': max(int(timeout), 1), 'options': f'-c statement_timeout={int(timeout * 1000)}'},
+    )
+
+    return HealthMonitor(
+        engine,
+        pool_stats,
+        interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+        max_pool_wait=settings.READY_MAX_POOL_WAIT_MS / 1000,
+    )
+
+
+health_monitor = create_health_monitor()
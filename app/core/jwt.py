@@ -1,22 +1,30 @@
 import jwt
 from datetime import datetime, timedelta, UTC
+
+from app.core.metrics import auth_duration
+from app.core.tracing import traced
+
 SECRET_KEY = 'my-super-super-secret-key'
 ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 
 
+@traced('jwt.encode')
 def create_access_token(data: dict) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({'exp': expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    with auth_duration.labels(operation='jwt_encode').time():
+        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+@traced('jwt.decode')
 def decode_token(token: str) -> dict:
     """Decode a JWT token."""
     try:
-        decoded_jwt = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with auth_duration.labels(operation='jwt_decode').time():
+            decoded_jwt = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if decoded_jwt['exp'] >= datetime.now(UTC).timestamp():
             return decoded_jwt
     except jwt.PyJWTError:
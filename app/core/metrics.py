@@ -0,0 +1,141 @@
+"""Prometheus metrics, kept by `prometheus_client`.
+
+With a single worker the values live in process memory. Behind several
+workers, export PROMETHEUS_MULTIPROC_DIR (a directory the workers share,
+e.g. a tmpfs) before starting the server: `prometheus_client` then keeps
+every worker's values in files there and any worker answers the scrape with
+the totals. Labels use route templates (`/books/{book_id}`), never raw
+paths, so the number of series stays bounded.
+"""
+import os
+import time
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import current_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Read by prometheus_client when it is imported, so it must be set in the environment
+MULTIPROCESS_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+
+http_requests = Counter(
+    'madr_http_requests', 'HTTP requests by route template and status.', ('method', 'route', 'status'),
+)
+http_duration = Histogram(
+    'madr_http_request_duration_seconds', 'HTTP request latency by route template.', ('method', 'route'),
+    buckets=LATENCY_BUCKETS,
+)
+db_queries = Histogram(
+    'madr_db_queries_per_request', 'Database statements executed per request.', ('route',),
+    buckets=COUNT_BUCKETS,
+)
+db_time = Histogram(
+    'madr_db_time_per_request_seconds', 'Time spent in database statements per request.', ('route',),
+    buckets=LATENCY_BUCKETS,
+)
+auth_duration = Histogram(
+    'madr_auth_duration_seconds', 'Duration of password hashing and token operations.', ('operation',),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# Pool gauges describe one worker: in multiprocess mode they are reported per live worker (`pid` label)
+pool_size = Gauge('madr_db_pool_size', 'Configured pool size.', multiprocess_mode='liveall')
+pool_checked_out = Gauge('madr_db_pool_checked_out', 'Connections in use.', multiprocess_mode='liveall')
+pool_overflow = Gauge('madr_db_pool_overflow', 'Connections opened beyond the pool size.', multiprocess_mode='liveall')
+pool_waiting = Gauge('madr_db_pool_waiting', 'Callers waiting for a connection.', multiprocess_mode='liveall')
+pool_wait_seconds = Gauge('madr_db_pool_wait_seconds', 'Average connection checkout wait.', multiprocess_mode='liveall')
+
+_pool_readers: list = []
+
+
+def render_metrics() -> bytes:
+    """Text format served at /metrics: this process, or every worker in multiprocess mode."""
+    if not MULTIPROCESS_DIR:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, MULTIPROCESS_DIR)
+
+    return generate_latest(registry)
+
+
+def refresh_pool_gauges():
+    """Write the pool state of this worker to its multiprocess files."""
+    for gauge, read in _pool_readers:
+        gauge.set(read())
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, e.g. `/books/{book_id}`."""
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+class MetricsMiddleware:
+    """Record latency, status and database usage of every HTTP request.
+
+    Database usage comes from the statement counts of the enclosing
+    ServerTimingMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = current_queries.get()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = route_template(scope)
+
+            http_requests.labels(method=scope['method'], route=route, status=str(status)).inc()
+            http_duration.labels(method=scope['method'], route=route).observe(elapsed)
+
+            if stats is not None:
+                db_queries.labels(route=route).observe(stats.count)
+                db_time.labels(route=route).observe(stats.seconds)
+
+            if _pool_readers:
+                refresh_pool_gauges()
+
+
+def register_pool_gauges(engine: Engine, pool_stats):
+    """Expose the connection pool state of `engine`.
+
+    The multiprocess collector reads the shared files rather than callbacks,
+    so there each worker writes its pool state after every request instead.
+    """
+    readers = [
+        (pool_size, lambda: engine.pool.size()),
+        (pool_checked_out, lambda: engine.pool.checkedout()),
+        (pool_overflow, lambda: max(engine.pool.overflow(), 0)),
+        (pool_waiting, lambda: pool_stats.waiting),
+        (pool_wait_seconds, lambda: pool_stats.average_wait),
+    ]
+
+    if MULTIPROCESS_DIR:
+        _pool_readers[:] = readers # Not written here: under preload this runs in the master
+        return
+
+    for gauge, read in readers:
+        gauge.set_function(read)
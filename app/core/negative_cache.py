@@ -0,0 +1,193 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Sequence, TypeVar
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session
+
+from app.core.changes import subscribe
+from app.core.config import settings
+from app.utils.ids import ids_condition
+
+Model = TypeVar('Model')
+
+
+class MissingIds:
+    """Answer lookups of ids known not to exist without querying the database.
+
+    Two filters are combined:
+    - a bounded LRU of ids that recently returned nothing, with a short TTL;
+    - an optional id range per table: ids above `max(id)` cannot exist.
+      `max(id)` is re-read from the database every `range_refresh` seconds
+      and raised immediately by committed inserts. Rows inserted elsewhere
+      (COPY, psql, a process without the change listener) are not announced,
+      so an id above a cached `max(id)` is confirmed with one more read of it
+      before being reported missing; the miss is then remembered in the LRU.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, range_filter: bool, range_refresh: float):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.range_filter = range_filter
+        self.range_refresh = range_refresh
+        self._missing: OrderedDict[tuple[str, int], float] = OrderedDict()
+        self._max_ids: dict[str, tuple[int, float]] = {}
+        self._lock = Lock()
+
+    def get(self, db: Session, model: type[Model], id: int, columns: Sequence[str] | None = None) -> Model | Row | None:
+        """Return the row of `model` with this id, or None when it does not exist.
+
+        With `columns`, only those columns are selected and a plain row is
+        returned instead of an ORM object.
+        """
+        resource = model.__tablename__
+
+        if self.is_missing(db, model, id):
+            return None
+
+        if columns is None:
+            obj = db.scalar(
+                select(model).where(model.id == id)
+            )
+        else:
+            obj = db.execute(
+                select(*[getattr(model, column) for column in columns]).where(model.id == id)
+            ).first()
+
+        if obj is None:
+            self.remember(resource, id)
+
+        return obj
+
+    def get_many(self, db: Session, model: type, ids: Sequence[int], columns: Sequence[str]) -> dict[int, tuple]:
+        """Return the requested columns of the rows with these ids, by id, in one query.
+
+        Ids known not to exist are not queried; ids the query does not find
+        are remembered as missing.
+        """
+        resource = model.__tablename__
+        candidates = [id for id in ids if not self._is_remembered(resource, id)]
+        above = self._above_range(db, model, candidates)
+
+        for id in above:
+            self.remember(resource, id)
+
+        candidates = [id for id in candidates if id not in above]
+
+        if not candidates:
+            return {}
+
+        rows = db.execute(
+            select(model.id, *[getattr(model, column) for column in columns]).where(ids_condition(db, model.id, candidates))
+        )
+        found = {row[0]: tuple(row[1:]) for row in rows}
+
+        for id in candidates:
+            if id not in found:
+                self.remember(resource, id)
+
+        return found
+
+    def is_missing(self, db: Session, model: type, id: int) -> bool:
+        """Check whether the id is known not to exist in the table of `model`."""
+        if self._is_remembered(model.__tablename__, id):
+            return True
+
+        if self._above_range(db, model, [id]):
+            self.remember(model.__tablename__, id) # Repeated lookups of this id hit the LRU
+            return True
+
+        return False
+
+    def _is_remembered(self, resource: str, id: int) -> bool:
+        if id < 1:
+            return True
+
+        with self._lock:
+            expires_at = self._missing.get((resource, id))
+
+            if expires_at is not None:
+                if expires_at > time.monotonic():
+                    return True
+                del self._missing[(resource, id)]
+
+        return False
+
+    def _above_range(self, db: Session, model: type, ids: Sequence[int]) -> set[int]:
+        """Ids above `max(id)`; a cached `max(id)` is read again once before trusting it."""
+        if not self.range_filter or not ids:
+            return set()
+
+        max_id, fresh = self._max_id(db, model)
+
+        if not fresh and max(ids) > max_id:
+            max_id, _ = self._max_id(db, model, reload=True)
+
+        return {id for id in ids if id > max_id}
+
+    def remember(self, resource: str, id: int):
+        """Record that an id does not exist."""
+        with self._lock:
+            self._missing[(resource, id)] = time.monotonic() + self.ttl
+            self._missing.move_to_end((resource, id))
+
+            while len(self._missing) > self.max_entries:
+                self._missing.popitem(last=False) # Evict the oldest entry
+
+    def forget(self, resource: str, ids: tuple[int, ...]):
+        """Drop ids that were just written so they can be found again.
+
+        An empty `ids` means the written ids are unknown: everything
+        remembered for the resource is dropped.
+        """
+        with self._lock:
+            if not ids:
+                for key in [key for key in self._missing if key[0] == resource]:
+                    del self._missing[key]
+                self._max_ids.pop(resource, None)
+                return
+
+            for id in ids:
+                self._missing.pop((resource, id), None)
+
+            if resource in self._max_ids:
+                max_id, refreshed_at = self._max_ids[resource]
+                self._max_ids[resource] = (max(max_id, *ids), refreshed_at)
+
+    def clear(self):
+        """Drop every remembered id and range."""
+        with self._lock:
+            self._missing.clear()
+            self._max_ids.clear()
+
+    def _max_id(self, db: Session, model: type, reload: bool = False) -> tuple[int, bool]:
+        """Return `max(id)` of a table and whether it was just read, reloading it when outdated."""
+        resource = model.__tablename__
+        cached = self._max_ids.get(resource)
+
+        if not reload and cached is not None and cached[1] + self.range_refresh > time.monotonic():
+            return cached[0], False
+
+        max_id = db.scalar(select(func.max(model.id))) or 0
+
+        with self._lock:
+            # Keep a higher value raised by an insert committed meanwhile
+            previous = self._max_ids.get(resource, (0, 0.0))[0]
+            self._max_ids[resource] = (max(max_id, previous), time.monotonic())
+
+        return max(max_id, previous), True
+
+
+missing_ids = MissingIds(
+    ttl=settings.NEGATIVE_CACHE_TTL_SECONDS,
+    max_entries=settings.NEGATIVE_CACHE_MAX_ENTRIES,
+    range_filter=settings.ID_RANGE_FILTER,
+    range_refresh=settings.ID_RANGE_REFRESH_SECONDS,
+)
+
+
+@subscribe
+def _forget_written_ids(resource: str, ids: tuple[int, ...]):
+    """Make ids created (or touched) by a committed write visible again."""
+    missing_ids.forget(resource, ids)
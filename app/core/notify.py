@@ -0,0 +1,114 @@
+import json
+import logging
+import select
+from threading import Event, Thread
+
+from sqlalchemy.engine import Engine
+
+from app.core.changes import apply_change, change_counter
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Resources whose caches must be dropped when notifications may have been missed
+RESOURCES = ('books', 'romancists', 'users')
+
+
+class ChangeListener:
+    """Background thread that LISTENs for changes committed by other workers.
+
+    Each notification is applied with `apply_change`, which bumps the ETag
+    versions and evicts the response and negative caches. Messages sent by
+    this worker are skipped since they were applied on commit. After a lost
+    connection every resource is invalidated, as notifications sent in the
+    meantime are gone.
+    """
+
+    def __init__(self, engine: Engine, channel: str, poll_interval: float = 1.0, retry_interval: float = 5.0):
+        self.engine = engine
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name='change-listener', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.poll_interval + 1)
+
+    def _run(self):
+        first_connection = True
+
+        while not self._stop.is_set():
+            try:
+                connection = self._connect()
+            except Exception:
+                logger.exception('Could not LISTEN on %s, retrying', self.channel)
+                self._stop.wait(self.retry_interval)
+                continue
+
+            if not first_connection:
+                self._invalidate_everything()
+            first_connection = False
+
+            try:
+                self._listen(connection)
+            except Exception:
+                logger.exception('Lost the LISTEN connection on %s', self.channel)
+            finally:
+                connection.close()
+
+    def _connect(self):
+        """Open a dedicated autocommit connection outside the pool and LISTEN on it."""
+        raw = self.engine.raw_connection()
+        connection = raw.driver_connection
+        raw.detach() # Do not hold one of the pool's connections forever
+
+        connection.autocommit = True
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+
+        return connection
+
+    def _listen(self, connection):
+        while not self._stop.is_set():
+            readable, _, _ = select.select([connection], [], [], self.poll_interval)
+
+            if not readable:
+                continue
+
+            connection.poll()
+
+            while connection.notifies:
+                self._handle(connection.notifies.pop(0).payload)
+
+    def _handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('Ignoring malformed change notification: %r', payload)
+            return
+
+        if message.get('origin') == change_counter.epoch:
+            return
+
+        apply_change(message['resource'], tuple(message.get('ids') or ()))
+
+    def _invalidate_everything(self):
+        for resource in RESOURCES:
+            apply_change(resource)
+
+
+def start_change_listener(engine: Engine) -> ChangeListener | None:
+    """Start the listener when notifications are enabled and the database is Postgres."""
+    if not settings.CHANGE_NOTIFY or engine.dialect.name != 'postgresql':
+        return None
+
+    listener = ChangeListener(engine, settings.CHANGE_NOTIFY_CHANNEL)
+    listener.start()
+
+    return listener
@@ -0,0 +1,114 @@
+from bisect import bisect_left, insort
+from threading import Lock
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.changes import subscribe
+from app.models.book import Book
+from app.models.romancist import Romancist
+from app.utils.ids import ids_condition
+
+
+class PrefixIndex:
+    """Sorted in-memory keys of a table for prefix lookups without a query.
+
+    Entries are `(key, id, display)` tuples kept in key order, so the
+    matches of a prefix are a contiguous run found with `bisect`. The table
+    is loaded on first use; committed changes (local or from other workers)
+    only queue their ids, and the next lookup reloads those rows. A change
+    without ids reloads the whole table.
+    """
+
+    def __init__(self, model: type, key_column: str, display_column: str):
+        self.model = model
+        self.key_column = key_column
+        self.display_column = display_column
+        self._entries: list[tuple[str, int, str]] = []
+        self._keys: dict[int, str] = {} # id -> key, to find the entry of a changed row
+        self._loaded = False
+        self._pending: set[int] = set()
+        self._lock = Lock()
+
+    def search(self, db: Session, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """(id, display) of the first `limit` rows whose key starts with `prefix`, in key order."""
+        with self._lock:
+            self._refresh(db)
+
+            matches = []
+            position = bisect_left(self._entries, (prefix,))
+
+            while len(matches) < limit and position < len(self._entries):
+                key, id, display = self._entries[position]
+
+                if not key.startswith(prefix):
+                    break
+
+                matches.append((id, display))
+                position += 1
+
+            return matches
+
+    def invalidate(self, ids: tuple[int, ...]):
+        """Queue changed ids; no ids means the whole table changed."""
+        with self._lock:
+            if not self._loaded: # Nothing to update until the first lookup loads the table
+                return
+
+            if ids:
+                self._pending.update(ids)
+            else:
+                self._loaded = False
+                self._pending.clear()
+
+    def clear(self):
+        """Drop the loaded entries; the next lookup reloads the table."""
+        with self._lock:
+            self._entries = []
+            self._keys = {}
+            self._loaded = False
+            self._pending.clear()
+
+    def _refresh(self, db: Session):
+        columns = (self.model.id, getattr(self.model, self.key_column), getattr(self.model, self.display_column))
+
+        if not self._loaded:
+            rows = db.execute(select(*columns)).all()
+            self._entries = sorted((key, id, display) for id, key, display in rows)
+            self._keys = {id: key for key, id, _ in self._entries}
+            self._loaded = True
+            return
+
+        if not self._pending:
+            return
+
+        ids = list(self._pending)
+        self._pending.clear()
+
+        for id in ids:
+            key = self._keys.pop(id, None)
+
+            if key is not None:
+                position = bisect_left(self._entries, (key, id))
+                del self._entries[position]
+
+        # Rows still present are inserted back with their current values
+        for id, key, display in db.execute(select(*columns).where(ids_condition(db, self.model.id, ids))):
+            insort(self._entries, (key, id, display))
+            self._keys[id] = key
+
+
+# Only loaded, and kept up to date, once AUTOCOMPLETE_MEMORY_INDEX lookups use them
+prefix_indexes = {
+    'books': PrefixIndex(Book, 'title_key', 'title'),
+    'romancists': PrefixIndex(Romancist, 'name_key', 'name'),
+}
+
+
+@subscribe
+def _queue_changed_rows(resource: str, ids: tuple[int, ...]):
+    """Keep the prefix indexes in step with committed writes."""
+    index = prefix_indexes.get(resource)
+
+    if index is not None:
+        index.invalidate(ids)
@@ -0,0 +1,144 @@
+import hmac
+import os
+import sys
+import time
+from collections import Counter
+from threading import Event, Thread, get_ident
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+# Leaf functions of threads that are idle, not working on a request
+IDLE_FUNCTIONS = frozenset({'wait', 'select', 'poll', '_worker'})
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    elif 'site-packages' in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Sample the Python stacks of every thread at a fixed interval.
+
+    Samples are aggregated as folded stacks (`root;caller;leaf count`), the
+    input format of flamegraph.pl, speedscope and inferno. Idle threads are
+    skipped. Nothing runs unless a profiler is started.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Profile in the folded stacks format, most frequent stacks first."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        own_thread = get_ident()
+
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    self._record(frame)
+
+            self.samples += 1
+
+    def _record(self, frame):
+        if frame.f_code.co_name in IDLE_FUNCTIONS:
+            return
+
+        labels = []
+
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+
+        self.stacks[';'.join(reversed(labels))] += 1
+
+
+def profile_for(seconds: float, interval: float = 0.005) -> SamplingProfiler:
+    """Sample the whole worker for `seconds` and return the finished profiler."""
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    time.sleep(seconds)
+    profiler.stop()
+
+    return profiler
+
+
+def is_authorized(token: str | None, secret: str) -> bool:
+    return bool(secret) and token is not None and hmac.compare_digest(token.encode(), secret.encode())
+
+
+class ProfilingMiddleware:
+    """Profile single requests that carry the profiling token.
+
+    The request runs as usual but its body is replaced by the folded stacks
+    sampled while it ran; the original status is kept in `X-Profiled-Status`.
+    Stacks of requests running concurrently in the worker are included too.
+    Only installed when PROFILING_SECRET is set.
+    """
+
+    def __init__(self, app: ASGIApp, secret: str, interval: float = 0.001):
+        self.app = app
+        self.secret = secret
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope['type'] != 'http'
+            or scope['path'].startswith('/debug/') # The window profiler answers on its own
+            or not is_authorized(Headers(scope=scope).get(PROFILE_HEADER), self.secret)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard(message: Message):
+            nonlocal status
+
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        profiler = SamplingProfiler(self.interval)
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        body = profiler.folded().encode()
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/plain; charset=utf-8'),
+                (b'content-length', str(len(body)).encode()),
+                (b'x-profiled-status', str(status).encode()),
+                (b'x-profile-samples', str(profiler.samples).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -1,14 +1,21 @@
 import bcrypt
 from fastapi import Depends, HTTPException, status
 
+from app.core.metrics import auth_duration
+from app.core.tracing import traced
+
+@traced('bcrypt.hash')
 def hash_password(password: str) -> str:
     """Hash a password for storing."""
-    salt = bcrypt.gensalt(rounds=12)
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+    with auth_duration.labels(operation='bcrypt_hash').time():
+        salt = bcrypt.gensalt(rounds=12)
+        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed_password.decode('utf-8')
 
+@traced('bcrypt.verify')
 def verify_password(password: str, hashed: str) -> bool:
     """Verify a stored password against one provided by user."""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    with auth_duration.labels(operation='bcrypt_verify').time():
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
 
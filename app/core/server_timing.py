@@ -0,0 +1,43 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import QueryStats, current_queries
+
+
+class ServerTimingMiddleware:
+    """Track the database statements of each request and report them.
+
+    The statements are counted and timed by the engine hooks in
+    `app.core.database`. With `emit_header`, responses carry e.g.
+    `Server-Timing: db;dur=3.1;desc="4 queries", app;dur=7.9`.
+    """
+
+    def __init__(self, app: ASGIApp, emit_header: bool = True):
+        self.app = app
+        self.emit_header = emit_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_queries.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message['type'] == 'http.response.start' and self.emit_header:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append(
+                    'Server-Timing',
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}',
+                )
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
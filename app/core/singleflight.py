@@ -0,0 +1,69 @@
+import logging
+from threading import Event, Lock
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class _Call:
+    """One in-flight execution shared by every caller of the same key."""
+
+    def __init__(self):
+        self.done = Event()
+        self.value = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into a single execution.
+
+    The first caller of a key (the leader) runs the function; callers that
+    arrive while it runs wait for its result, or get its exception. A
+    follower that waits longer than `timeout` stops waiting and runs the
+    function itself, so a stuck leader cannot block every request.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self._calls: dict[str, _Call] = {}
+        self._lock = Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Return `fn()`, sharing the execution with concurrent callers of `key`."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            return self._wait(key, call, fn)
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Number of keys currently being executed."""
+        with self._lock:
+            return len(self._calls)
+
+    def _wait(self, key: str, call: _Call, fn: Callable[[], T]) -> T:
+        if not call.done.wait(self.timeout):
+            logger.warning('Gave up waiting %.1fs for in-flight %s, running it again', self.timeout, key)
+            return fn()
+
+        if call.error is not None:
+            raise call.error
+
+        return call.value
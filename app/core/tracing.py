@@ -0,0 +1,301 @@
+"""Request tracing with W3C trace-context propagation.
+
+A sampled request gets a server span; code running inside it opens child
+spans with `span(name)`. Outside a sampled request `span` does nothing, so
+instrumented code costs a context variable lookup when tracing is off.
+Finished spans are batched and exported in the OTLP JSON shape, either as
+lines in a file or posted to a collector (e.g. an OpenTelemetry collector
+on :4318).
+"""
+import functools
+import json
+import logging
+import os
+import random
+import re
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from queue import Empty, Full, Queue
+from threading import Thread
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, kind: int = SPAN_KIND_INTERNAL, **attributes):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def end(self):
+        self.end_ns = time.time_ns()
+
+        if tracer.exporter is not None:
+            tracer.exporter.export(self)
+
+    def to_otlp(self) -> dict:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 0},
+        }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Span | None:
+    """Start a child of the current span, or return None outside a sampled trace."""
+    parent = current_span.get()
+
+    if parent is None:
+        return None
+
+    return Span(name, parent.trace_id, parent.span_id, kind, **attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Trace the `with` block as a child of the current span."""
+    child = start_span(name, kind, **attributes)
+
+    if child is None:
+        yield None
+        return
+
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = type(exc).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def traced(name: str):
+    """Decorator form of `span`; keeps the signature for FastAPI dependencies."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class FileExporter:
+    """Append spans as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, spans: list[Span], service_name: str):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for item in spans:
+                file.write(json.dumps({'service': service_name, **item.to_otlp()}) + '\n')
+
+
+class CollectorExporter:
+    """POST spans to an OTLP/HTTP JSON endpoint, e.g. http://localhost:4318/v1/traces."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def send(self, spans: list[Span], service_name: str):
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+                'scopeSpans': [{'scope': {'name': 'madr'}, 'spans': [item.to_otlp() for item in spans]}],
+            }],
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+class BatchExporter:
+    """Queue finished spans and send them from a background thread.
+
+    When the queue is full spans are dropped rather than slowing requests.
+    """
+
+    def __init__(self, backend: FileExporter | CollectorExporter, service_name: str, max_queue: int = 4096, batch_size: int = 512, interval: float = 1.0):
+        self.backend = backend
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: Queue[Span] = Queue(maxsize=max_queue)
+
+    def start(self):
+        """Start the sending thread; called in each worker, after the fork."""
+        Thread(target=self._run, name='trace-exporter', daemon=True).start()
+
+    def export(self, finished: Span):
+        try:
+            self._queue.put_nowait(finished)
+        except Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Send every queued span now."""
+        while not self._queue.empty():
+            self._send_batch()
+
+    def _run(self):
+        while True:
+            self._send_batch(wait=self.interval)
+
+    def _send_batch(self, wait: float = 0.0):
+        batch = []
+
+        try:
+            batch.append(self._queue.get(timeout=wait) if wait else self._queue.get_nowait())
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except Empty:
+            pass
+
+        if not batch:
+            return
+
+        try:
+            self.backend.send(batch, self.service_name)
+        except Exception:
+            logger.exception('Could not export %d spans', len(batch))
+
+
+class Tracer:
+    """Sampling decision and exporter shared by the worker."""
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.exporter: BatchExporter | None = None
+
+    def configure(self, exporter: BatchExporter | None, sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+tracer = Tracer()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Return (trace id, parent span id, sampled) from a W3C traceparent header."""
+    match = TRACEPARENT.match(value.strip().lower()) if value else None
+
+    if match is None or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None
+
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+class TracingMiddleware:
+    """Open a server span for sampled requests and continue incoming traces.
+
+    An incoming `traceparent` decides sampling (its sampled flag); without
+    one, requests are sampled at the configured rate. Sampled responses carry
+    a `traceresponse` header with their trace and span ids.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        parent = parse_traceparent(Headers(scope=scope).get('traceparent'))
+        sampled = parent[2] if parent else tracer.should_sample()
+
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = (parent[0], parent[1]) if parent else (os.urandom(16).hex(), None)
+        server_span = Span(scope['method'], trace_id, parent_id, SPAN_KIND_SERVER, **{'http.method': scope['method']})
+
+        async def send_wrapper(message: Message):
+            if message['type'] == 'http.response.start':
+                server_span.attributes['http.status_code'] = message['status']
+                MutableHeaders(scope=message).append('traceresponse', f'00-{trace_id}-{server_span.span_id}-01')
+
+            await send(message)
+
+        token = current_span.set(server_span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            server_span.error = type(exc).__name__
+            raise
+        finally:
+            current_span.reset(token)
+
+            route = getattr(scope.get('route'), 'path', None)
+            server_span.name = f'{scope["method"]} {route or "unmatched"}'
+            server_span.attributes['http.route'] = route or ''
+            server_span.end()
+
+
+def configure_tracing(settings) -> bool:
+    """Set up the exporter from the settings; returns whether tracing is on."""
+    if settings.TRACING_EXPORTER == 'none' or settings.TRACING_SAMPLE_RATE <= 0:
+        return False
+
+    if settings.TRACING_EXPORTER == 'file':
+        backend = FileExporter(settings.TRACING_FILE)
+    else:
+        backend = CollectorExporter(settings.TRACING_ENDPOINT)
+
+    tracer.configure(BatchExporter(backend, settings.TRACING_SERVICE_NAME), settings.TRACING_SAMPLE_RATE)
+
+    return True
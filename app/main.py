@@ -1,10 +1,74 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.routers import auth, user, romancist, book, health
+from app.routers import auth, user, romancist, book, autocomplete, health, metrics, profiling
 
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import DBAPIError
+
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.database import engine, pool_stats
+from app.core.deadlines import statement_timeout_handler
+from app.core.health import health_monitor
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.metrics import MetricsMiddleware, register_pool_gauges
+from app.core.notify import start_change_listener
+from app.core.profiler import ProfilingMiddleware
+from app.core.server_timing import ServerTimingMiddleware
+from app.core.tracing import TracingMiddleware, configure_tracing, tracer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the per-worker background services."""
+    # Evict local caches when another worker commits a change
+    listener = start_change_listener(engine)
+
+    # Keep the readiness state fresh without a query per probe
+    health_monitor.start()
+
+    if tracer.exporter is not None:
+        tracer.exporter.start()
+
+    yield
+
+    if listener is not None:
+        listener.stop()
+
+    health_monitor.stop()
+
+    if tracer.exporter is not None:
+        tracer.exporter.flush()
+
+app = FastAPI(title="MADR API", lifespan=lifespan)
 
-app = FastAPI(title="MADR API")
+# Queries cancelled by their statement_timeout budget answer 504
+app.add_exception_handler(DBAPIError, statement_timeout_handler)
+
+if settings.PROFILING_SECRET:
+    # Profile a single request, or the whole worker via /debug/profile
+    app.add_middleware(ProfilingMiddleware, secret=settings.PROFILING_SECRET)
+    app.include_router(profiling.router)
+
+# Reject excess work early when the worker or the DB pool is saturated
+app.add_middleware(
+    LoadSheddingMiddleware,
+    pool_stats=pool_stats,
+    max_in_flight=settings.LOAD_SHED_MAX_IN_FLIGHT,
+    write_reserve=settings.LOAD_SHED_WRITE_RESERVE,
+    max_pool_wait=settings.LOAD_SHED_MAX_POOL_WAIT_MS / 1000,
+    retry_after=settings.LOAD_SHED_RETRY_AFTER_SECONDS,
+)
+
+if settings.METRICS_ENABLED:
+    # Outside load shedding, so rejected requests are counted too
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+    register_pool_gauges(engine, pool_stats)
+
+# Count and time the statements of each request (read by the metrics above)
+app.add_middleware(ServerTimingMiddleware, emit_header=settings.SERVER_TIMING)
 
 # Set all CORS enabled origins
 app.add_middleware(
@@ -18,13 +82,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+# Compress large JSON bodies (e.g. BookList pages)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    level=settings.COMPRESSION_LEVEL,
+    max_level=settings.COMPRESSION_MAX_LEVEL,
+    thread_min_size=settings.COMPRESSION_THREAD_MIN_SIZE,
+)
+
+if configure_tracing(settings):
+    # Outermost, so the server span covers every other layer
+    app.add_middleware(TracingMiddleware)
+
 app.include_router(user.router)	
 app.include_router(auth.router)
 app.include_router(health.router)
 app.include_router(romancist.router)
 app.include_router(book.router)
+app.include_router(autocomplete.router)
 
 @app.get('/')
 def home():
@@ -1,19 +1,29 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Computed, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship, registry
 
 from app.models.base import Base
+from app.utils.sanitize import name_key
 
 # Ignore circular import for type checking
 if TYPE_CHECKING:
     from app.models.romancist import Romancist
 
+
 class Book(Base):
     __tablename__ = 'books'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    title: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    # Normalized title used for duplicate checks and exact lookups (unique index),
+    # generated by the database from `title` on every write
+    title_key: Mapped[str] = mapped_column(String, Computed(name_key('title'), persisted=True), nullable=False, unique=True, index=True)
     year: Mapped[int] = mapped_column(Integer, nullable=False)
 
     romancist_id: Mapped[int] = mapped_column(ForeignKey('romancists.id'))
-    romancist: Mapped["Romancist"] = relationship("Romancist", back_populates='books')
\ No newline at end of file
+    romancist: Mapped["Romancist"] = relationship("Romancist", back_populates='books')
+
+
+# Autocomplete matches prefixes with LIKE 'abc%' and returns them in key order;
+# with the "C" collation Postgres serves both from this index and stops after the limit
+Index('ix_books_title_key_prefix', Book.title_key.collate('C')).ddl_if(dialect='postgresql')
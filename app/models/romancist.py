@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Computed, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship, registry
 
 from app.models.base import Base
+from app.utils.sanitize import name_key
 
 # Ignore circular import for type checking
 if TYPE_CHECKING:
@@ -13,7 +14,15 @@ class Romancist(Base):
     __tablename__ = 'romancists'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    # Normalized name used for duplicate checks and exact lookups (unique index),
+    # generated by the database from `name` on every write
+    name_key: Mapped[str] = mapped_column(String, Computed(name_key('name'), persisted=True), nullable=False, unique=True, index=True)
 
     # One romancist can have many books
-    books: Mapped[list["Book"]] = relationship("Book", back_populates='romancist', cascade="all, delete-orphan")
\ No newline at end of file
+    books: Mapped[list["Book"]] = relationship("Book", back_populates='romancist', cascade="all, delete-orphan")
+
+
+# Autocomplete matches prefixes with LIKE 'abc%' and returns them in key order;
+# with the "C" collation Postgres serves both from this index and stops after the limit
+Index('ix_romancists_name_key_prefix', Romancist.name_key.collate('C')).ddl_if(dialect='postgresql')
@@ -0,0 +1,62 @@
+from fastapi import APIRouter
+from fastapi import Depends, Query, Response
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from typing import Annotated
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.prefix_index import prefix_indexes
+
+from app.schemas.autocomplete import Suggestions
+
+from app.models.book import Book
+from app.models.romancist import Romancist
+
+from app.utils.sanitize import sanitize_name
+from app.utils.responses import json_response, dumps
+
+from http import HTTPStatus
+
+
+router = APIRouter(
+    prefix='/autocomplete',
+    tags=['Autocomplete'],
+)
+
+
+def prefix_matches(db: Session, model: type, key_column: str, display_column: str, prefix: str, limit: int) -> list[tuple[int, str]]:
+    """(id, display) of the first rows whose normalized key starts with `prefix`, in key order."""
+    if settings.AUTOCOMPLETE_MEMORY_INDEX:
+        return prefix_indexes[model.__tablename__].search(db, prefix, limit)
+
+    key = getattr(model, key_column)
+
+    if db.get_bind().dialect.name == 'postgresql':
+        key = key.collate('C') # Matches the ix_*_prefix indexes, which serve the LIKE and the order
+
+    pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+    return db.execute(
+        select(model.id, getattr(model, display_column)).where(key.like(pattern, escape='\\')).order_by(key).limit(limit)
+    ).all()
+
+
+@router.get('/', response_model=Suggestions, status_code=HTTPStatus.OK)
+def autocomplete(
+    q: Annotated[str, Query(min_length=1, max_length=100, description='Beginning of a book title or romancist name')],
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=settings.AUTOCOMPLETE_MAX_RESULTS)] = 10,
+    db: Session = Depends(get_db),
+):
+    """Get the first book titles and romancist names starting with `q`."""
+    prefix = sanitize_name(q) # Keys are stored normalized, so the prefix is too
+    books = prefix_matches(db, Book, 'title_key', 'title', prefix, limit) if prefix else []
+    romancists = prefix_matches(db, Romancist, 'name_key', 'name', prefix, limit) if prefix else []
+
+    return json_response(dumps({
+        'books': [{'id': id, 'title': title} for id, title in books],
+        'romancists': [{'id': id, 'name': name} for id, name in romancists],
+    }), response)
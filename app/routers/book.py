@@ -1,7 +1,7 @@
 from fastapi import APIRouter
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Response
 
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
@@ -9,15 +9,28 @@ from sqlalchemy import func
 from typing import Annotated
 
 from app.core.auth import get_current_user
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.cache import response_cache, cache_key
+from app.core.changes import record_change
+from app.core.etag import conditional_get
+from app.core.negative_cache import missing_ids
+from app.core.tracing import span
 
-from app.schemas.book import BookResponse, BookCreate, BookUpdate, BookList, Message
+from app.schemas.book import (
+    BookResponse, BookCreate, BookUpdate, BookList, BookBatch, Message,
+    BookBulkDelete, BookBulkUpdate, BookBulkUpdated, BookBulkDeleted,
+)
 
 from app.models.book import Book
 from app.models.user import User
 from app.models.romancist import Romancist
 
-from app.utils.sanitize import sanitize_name
+from app.utils.sanitize import sanitize_name, clean_display_name
+from app.utils.responses import json_response, encode_rows, dumps
+from app.utils.db_json import json_body_query
+from app.utils.fields import sparse_fields
+from app.utils.ids import requested_ids, ids_condition
 
 from http import HTTPStatus
 
@@ -27,6 +40,9 @@ router = APIRouter(
     tags=['Book'],
 )
 
+# Fields of BookResponse, in order
+BOOK_FIELDS = list(BookResponse.model_fields)
+
 @router.post('/', response_model=BookResponse, status_code=HTTPStatus.CREATED)
 def create_book(
     book: BookCreate,
@@ -34,22 +50,20 @@ def create_book(
     db: Session = Depends(get_db),
 ):
     """Create a new book."""
-    sanitized_title = sanitize_name(book.title) # Sanitize the book title
+    title_key = sanitize_name(book.title) # Normalized key used for duplicate checks
 
-    db_book = db.scalar(
-        select(Book).where(Book.title == sanitized_title) # Check for existing book with sanitized title
+    existing_id = db.scalar(
+        select(Book.id).where(Book.title_key == title_key) # Check for existing book through the title_key index
     )
 
-    if db_book:
+    if existing_id is not None:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail="Book is already listed in MADR",
         )
    
-    # Check if the romancist exists
-    db_romancist = db.scalar(
-        select(Romancist).where(Romancist.id == book.romancist_id)
-    )
+    # Check if the romancist exists (known-missing ids skip the query)
+    db_romancist = missing_ids.get(db, Romancist, book.romancist_id)
 
     if not db_romancist:
         raise HTTPException(
@@ -58,12 +72,14 @@ def create_book(
         )
     
     db_book = Book(
-        title=sanitized_title,
+        title=clean_display_name(book.title), # Keep the original casing for display
         year=book.year,
         romancist_id=book.romancist_id,
     )
 
     db.add(db_book)
+    db.flush()
+    record_change(db, 'books', db_book.id)
     db.commit()
     db.refresh(db_book)
 
@@ -71,19 +87,30 @@ def create_book(
 
 
 @router.get('/{book_id}', response_model=BookResponse, status_code=HTTPStatus.OK)
-def read_book(book_id: int, db: Session = Depends(get_db)):
+def read_book(
+    book_id: int,
+    if_none_match: Annotated[str, Depends(conditional_get)],
+    fields: Annotated[list[str], Depends(sparse_fields(BookResponse))],
+    response: Response,
+    db: Session = Depends(get_db),
+):
     """Get a book by ID."""
-    db_book = db.scalar(
-        select(Book).where(Book.id == book_id)
-    )
+    def load(db: Session) -> bytes:
+        # Only the requested columns are selected
+        db_book = missing_ids.get(db, Book, book_id, columns=fields)
 
-    if not db_book:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail="Book is not listed in MADR",
-        )
-    
-    return db_book
+        if not db_book:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail="Book is not listed in MADR",
+            )
+
+        return dumps(dict(zip(fields, db_book)))
+
+    key = cache_key('books', 'read_book', book_id=book_id, fields=','.join(fields))
+    body = response_cache.fetch(key, load, db)
+
+    return json_response(body, response, if_none_match)
 
 @router.put('/{book_id}', response_model=BookResponse)
 def update_book(
@@ -105,15 +132,12 @@ def update_book(
     
     try:
         if book_update.title is not None:
-            sanitized_title = sanitize_name(book_update.title)
-            db_book.title = sanitized_title
+            db_book.title = clean_display_name(book_update.title) # The database regenerates title_key
         if book_update.year is not None:
             db_book.year = book_update.year
         if book_update.romancist_id is not None:
-            # Check if the romancist exists
-            db_romancist = db.scalar(
-                select(Romancist).where(Romancist.id == book_update.romancist_id)
-            )
+            # Check if the romancist exists (known-missing ids skip the query)
+            db_romancist = missing_ids.get(db, Romancist, book_update.romancist_id)
 
             if not db_romancist:
                 raise HTTPException(
@@ -123,6 +147,7 @@ def update_book(
             
             db_book.romancist_id = book_update.romancist_id
 
+        record_change(db, 'books', db_book.id)
         db.commit()
         db.refresh(db_book)
         return db_book
@@ -151,37 +176,204 @@ def delete_book(
         )
     
     db.delete(db_book)
+    record_change(db, 'books', db_book.id)
     db.commit()
 
     return {'message': 'Book deleted successfully'}
 
-@router.get('/', response_model=BookList, status_code=HTTPStatus.OK)
+def bulk_ids(db: Session, selection: BookBulkDelete) -> list[int]:
+    """Ids targeted by a bulk operation: the requested ids, or those matching the filter."""
+    if (selection.ids is None) == (selection.filter is None):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="Select the books with either ids or a filter",
+        )
+
+    if selection.ids is not None:
+        ids = list(dict.fromkeys(selection.ids)) # Distinct, in request order
+
+        if not ids or len(ids) > settings.BULK_MAX_BOOKS:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail=f"Between 1 and {settings.BULK_MAX_BOOKS} ids can be given at once",
+            )
+
+        return ids
+
+    filters = []
+
+    if selection.filter.romancist_id is not None:
+        filters.append(Book.romancist_id == selection.filter.romancist_id)
+
+    if selection.filter.year is not None:
+        filters.append(Book.year == selection.filter.year)
+
+    if not filters: # An empty filter would select the whole catalog
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="The filter needs romancist_id or year",
+        )
+
+    # Resolve the filter to ids first, locking the rows, so the write is bounded before it runs
+    ids = db.scalars(
+        select(Book.id).where(*filters).order_by(Book.id).limit(settings.BULK_MAX_BOOKS + 1).with_for_update()
+    ).all()
+
+    if len(ids) > settings.BULK_MAX_BOOKS:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"The filter matches more than {settings.BULK_MAX_BOOKS} books; narrow it down",
+        )
+
+    return list(ids)
+
+@router.patch('/', response_model=BookBulkUpdated)
+def update_books(
+    bulk: BookBulkUpdate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    """Update the year or romancist of many books at once, selected by ids or by a filter."""
+    values = bulk.changes.model_dump(exclude_none=True)
+
+    if not values:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="No changes given",
+        )
+
+    if 'romancist_id' in values and not missing_ids.get(db, Romancist, values['romancist_id']):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Romancist does not exist. Cannot update book with non-existent romancist.",
+        )
+
+    ids = bulk_ids(db, bulk)
+    updated = set()
+
+    if ids:
+        # One UPDATE ... RETURNING for the whole set
+        updated = set(db.scalars(
+            update(Book).where(ids_condition(db, Book.id, ids)).values(**values).returning(Book.id),
+            execution_options={'synchronize_session': False},
+        ))
+
+    if updated:
+        record_change(db, 'books', *updated)
+
+    db.commit()
+
+    return {
+        'updated': [id for id in ids if id in updated],
+        'missing': [id for id in ids if id not in updated],
+    }
+
+@router.delete('/', response_model=BookBulkDeleted)
+def delete_books(
+    bulk: BookBulkDelete,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    """Delete many books at once, selected by ids or by a filter."""
+    ids = bulk_ids(db, bulk)
+    deleted = set()
+
+    if ids:
+        # One DELETE ... RETURNING for the whole set
+        deleted = set(db.scalars(
+            delete(Book).where(ids_condition(db, Book.id, ids)).returning(Book.id),
+            execution_options={'synchronize_session': False},
+        ))
+
+    if deleted:
+        record_change(db, 'books', *deleted)
+
+    db.commit()
+
+    return {
+        'deleted': [id for id in ids if id in deleted],
+        'missing': [id for id in ids if id not in deleted],
+    }
+
+@router.get('/', response_model=BookList | BookBatch, status_code=HTTPStatus.OK)
 def read_books(
+    if_none_match: Annotated[str, Depends(conditional_get)],
+    fields: Annotated[list[str], Depends(sparse_fields(BookResponse))],
+    ids: Annotated[list[int] | None, Depends(requested_ids)],
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     db: Session = Depends(get_db),
     titulo: str | None = None,
     ano: int | None = None,
 ):
-    """Get a list of books with more than one parameter with pagination."""
-    query = select(Book)
+    """Get a list of books with more than one parameter with pagination, or the books given by `ids`."""
+    if ids is not None:
+        return read_books_by_ids(ids, fields, response, if_none_match, db)
 
-    if titulo:
-        query = query.where(Book.title.ilike(f'%{titulo}%'))
-    
-    if ano:
-        query = query.where(Book.year == ano)
-    
-    # If a search query is provided, return all matching results.
-    total = db.scalar(
-        select(func.count()).select_from(query.subquery())
+    def load(db: Session) -> bytes:
+        filters = []
+
+        if titulo:
+            filters.append(Book.title.ilike(f'%{titulo}%'))
+        
+        if ano:
+            filters.append(Book.year == ano)
+        
+        # If a search query is provided, return all matching results.
+        total = db.scalar(
+            select(func.count(Book.id)).where(*filters)
+        )
+
+        # The Pydantic path only serves full rows; subsets always select plain columns
+        full_orm = settings.BOOKS_LIST_MODE == 'orm' and fields == BOOK_FIELDS
+
+        if full_orm:
+            query = select(Book)
+        else:
+            # Plain tuples of the requested columns: no ORM hydration nor re-validation
+            query = select(*[getattr(Book, field) for field in fields])
+
+        query = query.where(*filters).order_by(Book.id)
+
+        if total > 20:
+            query = query.offset(skip).limit(limit)
+
+        if settings.BOOKS_LIST_MODE == 'db_json':
+            # The database builds the whole body; it is forwarded as is
+            body_query = json_body_query('books', query, fields, Book.id, db.get_bind().dialect.name)
+            return db.scalar(body_query).encode('utf-8')
+
+        if not full_orm:
+            return encode_rows('books', fields, db.execute(query))
+        
+        db_books = db.scalars(query).all()
+
+        with span('serialize.pydantic'):
+            return BookList(books=db_books).model_dump_json().encode('utf-8')
+
+    # titulo is matched with ILIKE, so its casing does not change the result
+    key = cache_key(
+        'books', 'read_books',
+        skip=skip, limit=limit, titulo=titulo.lower() if titulo else None, ano=ano or None,
+        fields=','.join(fields),
     )
+    body = response_cache.fetch(key, load, db)
 
-    if total > 20:
-        query = query.offset(skip).limit(limit)
-    
-    db_books = db.scalars(query).all()
+    return json_response(body, response, if_none_match)
 
-    return {'books': db_books}
-    
 
+def read_books_by_ids(ids: list[int], fields: list[str], response: Response, if_none_match: str, db: Session) -> Response:
+    """Fetch several books with one query, in request order, listing the ids not found."""
+    def load(db: Session) -> bytes:
+        rows = missing_ids.get_many(db, Book, ids, columns=fields)
+
+        return dumps({
+            'books': [dict(zip(fields, rows[id])) for id in ids if id in rows],
+            'missing': [id for id in ids if id not in rows],
+        })
+
+    key = cache_key('books', 'read_books', ids=','.join(map(str, ids)), fields=','.join(fields))
+    body = response_cache.fetch(key, load, db)
+
+    return json_response(body, response, if_none_match)
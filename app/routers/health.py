@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 from app.core.database import get_db
+from app.core.health import health_monitor
 
 router = APIRouter(
     prefix='/health',
@@ -9,11 +12,27 @@ router = APIRouter(
 )
 
 @router.get('/')
-def health_check(db: Session = Depends(get_db)):
+def health_check(response: Response, db: Session = Depends(get_db)):
     """Guarantees that the database is connected."""
     try:
         # Test connection
         db.execute(text('SELECT 1'))
         return {'status': 'Database connected successfully'}
     except Exception as e:
-        return {'status': 'Database connection failed', 'error': str(e)}
\ No newline at end of file
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+        return {'status': 'Database connection failed', 'error': str(e)}
+
+@router.get('/live')
+async def liveness():
+    """The worker's event loop is responsive. Never touches the database."""
+    return {'status': 'alive'}
+
+@router.get('/ready')
+async def readiness(response: Response):
+    """Whether the worker should receive traffic, from the cached background check."""
+    ready, details = health_monitor.readiness()
+
+    if not ready:
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+    return details
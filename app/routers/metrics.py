@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.core.metrics import render_metrics
+
+router = APIRouter(
+    tags=['Metrics'],
+)
+
+@router.get('/metrics', response_class=Response)
+def metrics():
+    """Expose the metrics in the Prometheus text format (totals of every worker in multiprocess mode)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,28 @@
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiler import is_authorized, profile_for
+
+router = APIRouter(
+    prefix='/debug',
+    tags=['Debug'],
+    include_in_schema=False,
+)
+
+def require_profile_token(x_profile_token: Annotated[str | None, Header()] = None):
+    """Only callers presenting PROFILING_SECRET may profile the worker."""
+    if not is_authorized(x_profile_token, settings.PROFILING_SECRET):
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail='Not enough permissions',
+        )
+
+@router.get('/profile', response_class=PlainTextResponse, dependencies=[Depends(require_profile_token)])
+def profile_worker(seconds: Annotated[float, Query(gt=0, le=60)] = 10.0):
+    """Sample every thread of this worker for `seconds`; returns folded stacks."""
+    profiler = profile_for(seconds)
+    return PlainTextResponse(profiler.folded(), headers={'X-Profile-Samples': str(profiler.samples)})
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Response
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -9,14 +9,24 @@ from sqlalchemy import func
 from typing import Annotated
 
 from app.core.auth import get_current_user
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.cache import response_cache, cache_key
+from app.core.changes import record_change
+from app.core.etag import conditional_get
+from app.core.negative_cache import missing_ids
+from app.core.tracing import span
 
-from app.schemas.romancist import RomancistResponse, RomancistCreate, RomancistUpdate, RomancistList, Message
+from app.schemas.romancist import RomancistResponse, RomancistCreate, RomancistUpdate, RomancistList, RomancistBatch, Message
 
 from app.models.romancist import Romancist
 from app.models.user import User
 
-from app.utils.sanitize import sanitize_name
+from app.utils.sanitize import sanitize_name, clean_display_name
+from app.utils.responses import json_response, encode_rows, dumps
+from app.utils.db_json import json_body_query
+from app.utils.fields import sparse_fields
+from app.utils.ids import requested_ids
 
 from http import HTTPStatus
 
@@ -25,6 +35,9 @@ router = APIRouter(
     tags=['Romancist'],
 )
 
+# Fields of RomancistResponse, in order
+ROMANCIST_FIELDS = list(RomancistResponse.model_fields)
+
 @router.post('/', response_model=RomancistResponse, status_code=HTTPStatus.CREATED)
 def create_romancist(
     romancist: RomancistCreate, 
@@ -32,43 +45,56 @@ def create_romancist(
     db: Session = Depends(get_db),
 ):
     """Create a new romancist."""
-    sanitized_name = sanitize_name(romancist.name) # Sanitize the romancist name
+    name_key = sanitize_name(romancist.name) # Normalized key used for duplicate checks
 
-    db_romancist = db.scalar(
-        select(Romancist).where(Romancist.name == sanitized_name) # Check for existing romancist with sanitized name
+    existing_id = db.scalar(
+        select(Romancist.id).where(Romancist.name_key == name_key) # Check for existing romancist through the name_key index
     )
 
-    if db_romancist:
+    if existing_id is not None:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail="Romancist is already listed in MADR",
         )
     
-    # Create new romancist with sanitized name
+    # Create new romancist keeping the original casing for display
     db_romancist = Romancist(
-        name=sanitized_name,
+        name=clean_display_name(romancist.name),
     )
 
     db.add(db_romancist)
+    db.flush()
+    record_change(db, 'romancists', db_romancist.id)
     db.commit()
     db.refresh(db_romancist)
 
     return db_romancist
 
 @router.get('/{romancist_id}', response_model=RomancistResponse, status_code=HTTPStatus.OK)
-def read_romancist(romancist_id: int, db: Session = Depends(get_db)):
+def read_romancist(
+    romancist_id: int,
+    if_none_match: Annotated[str, Depends(conditional_get)],
+    fields: Annotated[list[str], Depends(sparse_fields(RomancistResponse))],
+    response: Response,
+    db: Session = Depends(get_db),
+):
     """Get a romancist by ID."""
-    db_romancist = db.scalar(
-        select(Romancist).where(Romancist.id == romancist_id)
-    )
+    def load(db: Session) -> bytes:
+        # Only the requested columns are selected
+        db_romancist = missing_ids.get(db, Romancist, romancist_id, columns=fields)
 
-    if not db_romancist:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail="Romancist is not listed in MADR",
-        )
-    
-    return db_romancist
+        if not db_romancist:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail="Romancist is not listed in MADR",
+            )
+
+        return dumps(dict(zip(fields, db_romancist)))
+
+    key = cache_key('romancists', 'read_romancist', romancist_id=romancist_id, fields=','.join(fields))
+    body = response_cache.fetch(key, load, db)
+
+    return json_response(body, response, if_none_match)
 
 @router.put('/{romancist_id}', response_model=RomancistResponse)
 def update_romancist(
@@ -91,9 +117,9 @@ def update_romancist(
     try:
         # Update fields if they are provided
         if romancist.name is not None:
-            sanitized_name = sanitize_name(romancist.name)
-            db_romancist.name = sanitized_name
+            db_romancist.name = clean_display_name(romancist.name) # The database regenerates name_key
     
+        record_change(db, 'romancists', db_romancist.id)
         db.commit()
         db.refresh(db_romancist)
     
@@ -123,31 +149,88 @@ def delete_romancist(
         )
     
     db.delete(db_romancist)
+    record_change(db, 'romancists', db_romancist.id)
+    record_change(db, 'books') # Books are deleted in cascade
     db.commit()
 
     return {'message': 'Romancist deleted successfully'}
 
-@router.get('/', response_model=RomancistList, status_code=HTTPStatus.OK)
+@router.get('/', response_model=RomancistList | RomancistBatch, status_code=HTTPStatus.OK)
 def read_romancists(
+    if_none_match: Annotated[str, Depends(conditional_get)],
+    fields: Annotated[list[str], Depends(sparse_fields(RomancistResponse))],
+    ids: Annotated[list[int] | None, Depends(requested_ids)],
+    response: Response,
     skip: int = 0, 
     limit: int = 10, 
     db: Session = Depends(get_db), 
     nome: str | None = None
 ):
-    """Get a list of romancists with optional search query and conditional pagination."""
-    query = select(Romancist)
-    if nome:
-        query = query.where(Romancist.name.ilike(f'%{nome}%'))
-    
-    # If a search query is provided, return all matching results.
-    total = db.scalar(
-        select(func.count()).select_from(query.subquery())
-    )
+    """Get a list of romancists with optional search query and conditional pagination, or the romancists given by `ids`."""
+    if ids is not None:
+        return read_romancists_by_ids(ids, fields, response, if_none_match, db)
+
+    def load(db: Session) -> bytes:
+        filters = []
+
+        if nome:
+            filters.append(Romancist.name.ilike(f'%{nome}%'))
+        
+        # If a search query is provided, return all matching results.
+        total = db.scalar(
+            select(func.count(Romancist.id)).where(*filters)
+        )
 
-    # Apply pagination only if there is a total results more than 20.
-    if total > 20:
-        query = query.offset(skip).limit(limit)
-    
-    db_romancists = db.scalars(query).all()
+        # The Pydantic path only serves full rows; subsets always select plain columns
+        full_orm = settings.ROMANCISTS_LIST_MODE == 'orm' and fields == ROMANCIST_FIELDS
+
+        if full_orm:
+            query = select(Romancist)
+        else:
+            # Plain tuples of the requested columns: no ORM hydration nor re-validation
+            query = select(*[getattr(Romancist, field) for field in fields])
+
+        query = query.where(*filters).order_by(Romancist.id)
+
+        # Apply pagination only if there is a total results more than 20.
+        if total > 20:
+            query = query.offset(skip).limit(limit)
+
+        if settings.ROMANCISTS_LIST_MODE == 'db_json':
+            # The database builds the whole body; it is forwarded as is
+            body_query = json_body_query('romancists', query, fields, Romancist.id, db.get_bind().dialect.name)
+            return db.scalar(body_query).encode('utf-8')
+
+        if not full_orm:
+            return encode_rows('romancists', fields, db.execute(query))
+        
+        db_romancists = db.scalars(query).all()
+
+        with span('serialize.pydantic'):
+            return RomancistList(romancists=db_romancists).model_dump_json().encode('utf-8')
+
+    # nome is matched with ILIKE, so its casing does not change the result
+    key = cache_key(
+        'romancists', 'read_romancists',
+        skip=skip, limit=limit, nome=nome.lower() if nome else None,
+        fields=','.join(fields),
+    )
+    body = response_cache.fetch(key, load, db)
     
-    return {'romancists': db_romancists}
+    return json_response(body, response, if_none_match)
+
+
+def read_romancists_by_ids(ids: list[int], fields: list[str], response: Response, if_none_match: str, db: Session) -> Response:
+    """Fetch several romancists with one query, in request order, listing the ids not found."""
+    def load(db: Session) -> bytes:
+        rows = missing_ids.get_many(db, Romancist, ids, columns=fields)
+
+        return dumps({
+            'romancists': [dict(zip(fields, rows[id])) for id in ids if id in rows],
+            'missing': [id for id in ids if id not in rows],
+        })
+
+    key = cache_key('romancists', 'read_romancists', ids=','.join(map(str, ids)), fields=','.join(fields))
+    body = response_cache.fetch(key, load, db)
+
+    return json_response(body, response, if_none_match)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from http import HTTPStatus
 
@@ -9,11 +9,16 @@ from sqlalchemy.exc import IntegrityError
 from app.core.database import get_db
 from app.core.security import hash_password
 from app.core.auth import get_current_user
+from app.core.changes import record_change
+from app.core.negative_cache import missing_ids
 
 from app.models.user import User
 
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, Message
 
+from app.utils.fields import sparse_fields
+from app.utils.responses import json_response, dumps
+
 from typing import List
 from typing import Annotated
 
@@ -53,6 +58,8 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
+    db.flush()
+    record_change(db, 'users', db_user.id)
     db.commit()
     db.refresh(db_user)
 
@@ -60,16 +67,24 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get('/me', response_model=UserResponse, status_code=HTTPStatus.OK)
-async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]):
+async def read_users_me(
+    current_user: Annotated[User, Depends(get_current_user)],
+    fields: Annotated[list[str], Depends(sparse_fields(UserResponse))],
+    response: Response,
+):
     """Get the current authenticated user."""
-    return current_user
+    return json_response(dumps({field: getattr(current_user, field) for field in fields}), response)
 
 @router.get('/{user_id}', response_model=UserResponse, status_code=HTTPStatus.OK)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+def read_user(
+    user_id: int,
+    fields: Annotated[list[str], Depends(sparse_fields(UserResponse))],
+    response: Response,
+    db: Session = Depends(get_db),
+):
     """Get a user by ID."""
-    db_user = db.scalar(
-        select(User).where(User.id == user_id)
-    )
+    # Only the requested columns are selected
+    db_user = missing_ids.get(db, User, user_id, columns=fields)
 
     if not db_user:
         raise HTTPException(
@@ -77,7 +92,7 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
             detail="User not found",
         )
     
-    return db_user
+    return json_response(dumps(dict(zip(fields, db_user))), response)
 
 @router.delete('/{user_id}', response_model=Message)
 def delete_user(
@@ -103,6 +118,7 @@ def delete_user(
         )
     
     db.delete(db_user)
+    record_change(db, 'users', db_user.id)
     db.commit()
 
     return {'message': 'User deleted successfully'}
@@ -139,6 +155,7 @@ def update_user(
         if user_update.password is not None:
             db_user.password_hash = hash_password(user_update.password)
 
+        record_change(db, 'users', db_user.id)
         db.commit()
         db.refresh(db_user)
 
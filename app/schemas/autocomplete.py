@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class BookSuggestion(BaseModel):
+    """Validate data for returning a book title matching a prefix."""
+    id: int
+    title: str
+
+class RomancistSuggestion(BaseModel):
+    """Validate data for returning a romancist name matching a prefix."""
+    id: int
+    name: str
+
+class Suggestions(BaseModel):
+    """Validate data for returning the prefix matches of titles and names."""
+    books: list[BookSuggestion]
+    romancists: list[RomancistSuggestion]
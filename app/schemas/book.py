@@ -27,6 +27,39 @@ class BookList(BaseModel):
     """Validate data for returning a list of books."""
     books: list[BookResponse]
 
+class BookBatch(BookList):
+    """Validate data for returning books requested by id, in request order."""
+    missing: list[int]
+
+class BookFilter(BaseModel):
+    """Validate the filter selecting the books of a bulk operation."""
+    romancist_id: int | None = None
+    year: int | None = None
+
+class BookBulkDelete(BaseModel):
+    """Validate the books targeted by a bulk operation: a list of ids or a filter."""
+    ids: list[int] | None = None
+    filter: BookFilter | None = None
+
+class BookBulkChanges(BaseModel):
+    """Validate the values applied to every book of a bulk update."""
+    year: int | None = None
+    romancist_id: int | None = None
+
+class BookBulkUpdate(BookBulkDelete):
+    """Validate data for updating many books at once."""
+    changes: BookBulkChanges
+
+class BookBulkUpdated(BaseModel):
+    """Validate data for returning the ids updated by a bulk update and those not found."""
+    updated: list[int]
+    missing: list[int]
+
+class BookBulkDeleted(BaseModel):
+    """Validate data for returning the ids deleted by a bulk delete and those not found."""
+    deleted: list[int]
+    missing: list[int]
+
 class Message(BaseModel):
     """Validate data for returning a message."""
     message: str
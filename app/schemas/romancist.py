@@ -19,6 +19,10 @@ class RomancistList(BaseModel):
     """Validate data for returning a list of romancists."""
     romancists: list[RomancistResponse]
 
+class RomancistBatch(RomancistList):
+    """Validate data for returning romancists requested by id, in request order."""
+    missing: list[int]
+
 
 class Message(BaseModel):
     """Validate data for returning a message."""
@@ -0,0 +1,141 @@
+"""Production server: Gunicorn managing Uvicorn workers.
+
+Usage: python -m app.server [--config server.toml]
+
+The app is imported once in the master and forked into the workers
+(preload), so code and read-only data are shared copy-on-write. Workers are
+recycled after a number of requests or when their memory grows past a
+threshold, and are replaced without dropping in-flight requests.
+"""
+import argparse
+import logging
+import os
+import signal
+import tomllib
+from pathlib import Path
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / 'server.toml'
+
+# Options read from the [server] table and passed to Gunicorn as is
+GUNICORN_OPTIONS = (
+    'bind', 'workers', 'preload_app', 'max_requests', 'max_requests_jitter',
+    'timeout', 'graceful_timeout', 'keepalive', 'backlog', 'loglevel',
+    'accesslog', 'errorlog',
+)
+
+
+def current_rss_mb() -> float:
+    """Resident memory of this process in MiB."""
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        import resource # Not Linux: fall back to the peak RSS (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def available_cores() -> int:
+    """Number of cores this process may run on (respects CPU affinity/cgroup pinning)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class RecyclingUvicornWorker(UvicornWorker):
+    """Uvicorn worker that restarts itself gracefully when its RSS exceeds a limit.
+
+    The check runs on the worker heartbeat. Exceeding the limit triggers the
+    same graceful shutdown as SIGTERM; the master then forks a fresh worker.
+    """
+
+    max_memory_mb: float = 0 # 0 disables the check
+
+    async def callback_notify(self):
+        await super().callback_notify()
+
+        if self.max_memory_mb and self.alive and current_rss_mb() > self.max_memory_mb:
+            logger.warning('Worker %s above %s MiB, recycling', os.getpid(), self.max_memory_mb)
+            self.alive = False
+            os.kill(os.getpid(), signal.SIGTERM)
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloaded master."""
+    from app.core.database import engine
+
+    engine.dispose(close=False)
+
+
+def on_starting(server):
+    """Start multiprocess metrics from zero: drop the files of a previous run."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        for path in Path(directory).glob('*.db'):
+            path.unlink(missing_ok=True)
+
+
+def child_exit(server, worker):
+    """Stop reporting the per-worker gauges of an exited worker; its counts stay in the totals."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def load_config(path: Path) -> dict:
+    """Read the [server] table of the config file and resolve automatic values."""
+    with open(path, 'rb') as config_file:
+        config = tomllib.load(config_file).get('server', {})
+
+    if config.get('workers', 'auto') == 'auto':
+        config['workers'] = available_cores()
+
+    return config
+
+
+class MadrApplication(BaseApplication):
+    """Gunicorn application serving `app.main:app`."""
+
+    def __init__(self, config: dict):
+        self.config = config
+        super().__init__()
+
+    def load_config(self):
+        for name in GUNICORN_OPTIONS:
+            if name in self.config:
+                self.cfg.set(name, self.config[name])
+
+        RecyclingUvicornWorker.max_memory_mb = self.config.get('max_worker_memory_mb', 0)
+
+        # The class itself, not its dotted path: under `python -m` this module is __main__
+        self.cfg.set('worker_class', RecyclingUvicornWorker)
+        self.cfg.set('post_fork', post_fork)
+        self.cfg.set('on_starting', on_starting)
+        self.cfg.set('child_exit', child_exit)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the MADR API with several workers.')
+    parser.add_argument('--config', type=Path, default=DEFAULT_CONFIG)
+    args = parser.parse_args()
+
+    MadrApplication(load_config(args.config)).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+from typing import Sequence
+
+from sqlalchemy import ColumnElement, Select, Text, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+
+def json_body_query(key: str, query: Select, fields: Sequence[str], order_by: ColumnElement, dialect: str) -> Select:
+    """Wrap a column select so the database returns the whole `{key: [...]}` body as text.
+
+    `query` must select exactly `fields`; rows are aggregated in ascending
+    `order_by` order, which must match the order of `query`. Postgres uses json_agg/json_build_object; other
+    dialects fall back to SQLite's json_group_array/json_object.
+    """
+    page = query.add_columns(order_by.label('_order')).subquery()
+    pairs = []
+
+    for field in fields:
+        pairs += [literal(field), page.c[field]]
+
+    if dialect == 'postgresql':
+        rows = func.json_agg(aggregate_order_by(func.json_build_object(*pairs), page.c._order))
+        body = func.json_build_object(literal(key), func.coalesce(rows, literal_column("'[]'::json")))
+
+        return select(cast(body, Text))
+
+    # SQLite keeps the subquery order and returns '[]' for an empty page
+    return select(func.json_object(literal(key), func.json_group_array(func.json_object(*pairs))))
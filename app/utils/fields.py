@@ -0,0 +1,35 @@
+from http import HTTPStatus
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+
+def sparse_fields(schema: type[BaseModel]):
+    """Create a dependency parsing `?fields=id,title` against the fields of `schema`.
+
+    Returns the requested fields in schema order, or all of them when the
+    parameter is missing.
+    """
+    all_fields = list(schema.model_fields)
+
+    def dependency(
+        fields: str | None = Query(
+            default=None,
+            description=f"Comma-separated subset of: {', '.join(all_fields)}",
+        ),
+    ) -> list[str]:
+        if fields is None:
+            return all_fields
+
+        requested = {field.strip() for field in fields.split(',') if field.strip()}
+        unknown = sorted(requested - set(all_fields))
+
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail=f"Invalid fields: {', '.join(unknown) or 'none requested'}. Allowed: {', '.join(all_fields)}",
+            )
+
+        return [field for field in all_fields if field in requested]
+
+    return dependency
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+from typing import Sequence
+
+from fastapi import HTTPException, Query
+from sqlalchemy import ColumnElement, Integer, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def requested_ids(
+    ids: str | None = Query(
+        default=None,
+        description=f'Comma-separated ids to fetch in one call (at most {settings.MULTI_GET_MAX_IDS}); other filters and pagination are ignored',
+    ),
+) -> list[int] | None:
+    """Parse `?ids=3,1,2` into distinct ids in request order, or None when absent."""
+    if ids is None:
+        return None
+
+    try:
+        parsed = list(dict.fromkeys(int(id) for id in ids.split(',') if id.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail='ids must be comma-separated integers',
+        )
+
+    if not parsed or len(parsed) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f'Between 1 and {settings.MULTI_GET_MAX_IDS} ids can be requested at once',
+        )
+
+    return parsed
+
+
+def ids_condition(db: Session, column, ids: Sequence[int]) -> ColumnElement[bool]:
+    """`column = ANY(:ids)` on Postgres, `column IN (...)` elsewhere."""
+    if db.get_bind().dialect.name == 'postgresql':
+        # One array parameter: the statement text is the same for any number of ids
+        return column == any_(bindparam('ids', list(ids), type_=ARRAY(Integer)))
+
+    return column.in_(ids)
@@ -0,0 +1,49 @@
+import json
+from http import HTTPStatus
+from typing import Any, Iterable, Sequence
+
+from fastapi import Response
+
+from app.core.etag import compute_etag, etag_matches
+from app.core.tracing import traced
+
+try:
+    import orjson # Declared dependency; the stdlib fallback below encodes the same bytes
+except ImportError:
+    orjson = None
+
+
+@traced('serialize.json')
+def dumps(content: Any) -> bytes:
+    """Encode plain Python data to the same bytes FastAPI's JSONResponse would send."""
+    if orjson is not None:
+        return orjson.dumps(content)
+
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_rows(key: str, fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode trusted database rows as `{key: [{field: value, ...}, ...]}` without Pydantic."""
+    return dumps({key: [dict(zip(fields, row)) for row in rows]})
+
+
+def json_response(body: bytes, response: Response, if_none_match: str | None = None) -> Response:
+    """Wrap an already encoded JSON body, keeping headers set by dependencies.
+
+    Conditional routes pass the request's If-None-Match (`conditional_get`):
+    the body then gets an ETag, and a matching request receives
+    `304 Not Modified` without it.
+    """
+    headers = dict(response.headers)
+
+    if if_none_match is not None:
+        headers['ETag'] = compute_etag(body)
+
+        if etag_matches(if_none_match, headers['ETag']):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=body,
+        media_type='application/json',
+        headers=headers,
+    )
@@ -1,8 +1,16 @@
 import re
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, literal_column
+
 def sanitize_name(name: str) -> str:
     """Sanitize a romancist and a book name by stripping leading/trailing whitespace, 
     converting to lowercase, and replacing multiple spaces with a single space.
+
+    The result is the normalized lookup key stored in `books.title_key` and
+    `romancists.name_key`.
     """
     lower_name = name.lower() # Convert to lowercase
     strip_name = lower_name.strip() # Remove leading/trailing whitespace
@@ -10,3 +18,47 @@ def sanitize_name(name: str) -> str:
 
     return sanitized_name
 
+def clean_display_name(name: str) -> str:
+    """Tidy a romancist or book name for display, keeping the original casing."""
+    strip_name = name.strip() # Remove leading/trailing whitespace
+    display_name = re.sub(r'\s+', ' ', strip_name) # Replace multiple spaces with a single space
+
+    return display_name
+
+
+class name_key(ColumnElement):
+    """SQL for `sanitize_name(<column>)`, used as the expression of the generated key columns.
+
+    The database computes the key on every INSERT and UPDATE, so rows written
+    by Core statements, bulk loaders or psql can never carry a stale key.
+    """
+
+    inherit_cache = True
+
+    def __init__(self, column_name: str):
+        self.column = literal_column(column_name)
+
+
+@compiles(name_key, 'postgresql')
+def _name_key_postgresql(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"lower(btrim(regexp_replace({column}, '\\s+', ' ', 'g')))"
+
+
+@compiles(name_key)
+def _name_key_default(element, compiler, **kw):
+    # Other dialects (SQLite in tests and benchmarks) call sanitize_name itself; see register_sanitize_name
+    return f'sanitize_name({compiler.process(element.column, **kw)})'
+
+
+def register_sanitize_name(engine: Engine) -> Engine:
+    """Make `sanitize_name` callable from SQL on a SQLite engine, for the generated key columns.
+
+    Postgres computes the keys with built-in functions; SQLite engines (tests,
+    benchmarks) must call this before creating or writing the tables.
+    """
+    def register(dbapi_connection, connection_record):
+        dbapi_connection.create_function('sanitize_name', 1, sanitize_name, deterministic=True)
+
+    event.listen(engine, 'connect', register)
+    return engine
@@ -0,0 +1,113 @@
+"""Microbenchmarks of the authentication hot path.
+
+Usage:
+    python -m benchmarks.bench_auth [--repeat 30] [--number 1000]
+        [--output benchmarks/results/auth.json] [--baseline baseline.json]
+
+Every authenticated request runs `oauth2_scheme`, `decode_token` and the
+user lookup of `get_current_user`; every login runs `verify_password` and
+`create_access_token`. Each function is timed on its own and in those
+combinations, with warmup calls first. The user lookup runs against an
+in-memory SQLite database, so it measures the ORM work rather than the
+network. bcrypt is timed with fewer calls since one takes hundreds of ms.
+
+Results are saved as JSON; with `--baseline` the medians are compared with
+a previous run and the exit status is 1 when one regressed by more than
+`--max-regression`.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app.core.auth import get_current_user, oauth2_scheme
+from app.core.jwt import ALGORITHM, create_access_token, decode_token
+from app.core.security import hash_password, verify_password
+from app.models.base import Base
+from app.models.user import User
+from app.utils.sanitize import register_sanitize_name
+from benchmarks.harness import compare_results, measure, print_results, save_results
+
+PASSWORD = 'benchpassword'
+
+
+def run_sync(coroutine):
+    """Run a coroutine that never suspends, without an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    coroutine.close()
+    raise RuntimeError('Coroutine suspended')
+
+
+def bearer_scope(token: str) -> dict:
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/users/me',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--number', type=int, default=1000, help='Calls averaged in each sample')
+    parser.add_argument('--bcrypt-repeat', type=int, default=5)
+    parser.add_argument('--output', type=Path, default=Path('benchmarks/results/auth.json'))
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--max-regression', type=float, default=0.10)
+    args = parser.parse_args()
+
+    engine = register_sanitize_name(create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool))
+    Base.metadata.create_all(engine)
+    password_hash = hash_password(PASSWORD)
+
+    with Session(engine) as db:
+        db.add(User(username='bench', email='bench@example.com', password_hash=password_hash))
+        db.commit()
+
+        token = create_access_token({'sub': '1'})
+        scope = bearer_scope(token)
+
+        def authenticate() -> User:
+            return get_current_user(run_sync(oauth2_scheme(Request(scope))), db)
+
+        def login() -> str:
+            assert verify_password(PASSWORD, password_hash)
+            return create_access_token({'sub': '1'})
+
+        assert authenticate().username == 'bench'
+
+        fast = {'repeat': args.repeat, 'number': args.number}
+        orm = {'repeat': args.repeat, 'number': max(args.number // 10, 1)}
+        bcrypt = {'repeat': args.bcrypt_repeat, 'number': 1, 'warmup': 1}
+
+        results = [
+            measure('oauth2_scheme', lambda: run_sync(oauth2_scheme(Request(scope))), **fast),
+            measure(f'decode_token ({ALGORITHM})', lambda: decode_token(token), **fast),
+            measure(f'create_access_token ({ALGORITHM})', lambda: create_access_token({'sub': '1'}), **fast),
+            measure('get_current_user (decode + lookup)', lambda: get_current_user(token, db), **orm),
+            measure('authenticated request path', authenticate, **orm),
+            measure('verify_password (bcrypt)', lambda: verify_password(PASSWORD, password_hash), **bcrypt),
+            measure('hash_password (bcrypt)', lambda: hash_password(PASSWORD), **bcrypt),
+            measure('login path', login, **bcrypt),
+        ]
+
+    print_results(results)
+
+    save_results(results, args.output, repeat=args.repeat, number=args.number)
+    print(f'\nSaved to {args.output}')
+
+    if args.baseline and not compare_results(results, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Scripted load scenarios against every router, on SQLite and Postgres.
+
+Usage:
+    python -m benchmarks.bench_load [--backend sqlite|postgres] [--database-url URL]
+        [--sizes 1000,10000] [--scenarios login,users_me,...] [--concurrency 16]
+        [--duration 10] [--output results.json] [--baseline baseline.json]
+
+Each dataset size is seeded into a fresh schema and every scenario is run
+against the app in-process (ASGI transport), or against a running server
+with `--url` (which must use the same database). Latency percentiles and
+throughput are printed and stored as JSON; with `--baseline` every scenario
+is compared with a previous run and the exit status is 1 when one regressed
+by more than `--max-regression`.
+
+The Postgres database given by `--database-url` is dropped and recreated:
+never point it at data you want to keep.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import response_cache
+from app.core.database import get_db
+from app.core.negative_cache import missing_ids
+from app.core.prefix_index import prefix_indexes
+from app.main import app
+from app.models.base import Base
+from app.utils.sanitize import register_sanitize_name
+from benchmarks.dataset import LAST_NAMES, NOUNS, PASSWORD, DatasetSpec, load, user_email
+from benchmarks.harness import git_commit
+from benchmarks.loadgen import LoadResult, Send, print_load_results, run_actions
+
+YEARS = range(1950, 2025)
+USERS = 50
+
+
+def seed(engine: Engine, books: int):
+    """Create a fresh schema with `books` books, books // 10 romancists and a few users."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    load(engine, DatasetSpec(romancists=max(books // 10, 1), books=books, users=USERS, seed=books))
+
+
+def scenarios(size: int, tokens: list[str]) -> dict:
+    """Scenario name -> action performing one iteration through `send`."""
+    def auth(i: int) -> dict:
+        return {'Authorization': f'Bearer {tokens[i % len(tokens)]}'}
+
+    async def login(send: Send, i: int):
+        await send('POST', '/auth/token', data={'username': user_email(i % USERS + 1), 'password': PASSWORD})
+
+    async def users_me(send: Send, i: int):
+        await send('GET', '/users/me', headers=auth(i))
+
+    async def book_crud(send: Send, i: int):
+        created = await send('POST', '/books/', headers=auth(i), json={
+            'title': f'crud {i} {random.random()}', 'year': 2000, 'romancist_id': 1 + i % max(size // 10, 1),
+        })
+
+        if created is None or created.status_code != 201:
+            return
+
+        book_id = created.json()['id']
+        await send('GET', f'/books/{book_id}')
+        await send('PUT', f'/books/{book_id}', headers=auth(i), json={'year': 2001})
+        await send('DELETE', f'/books/{book_id}', headers=auth(i))
+
+    async def read_book(send: Send, i: int):
+        await send('GET', f'/books/{random.randint(1, size)}')
+
+    async def search_books(send: Send, i: int):
+        params = {'titulo': random.choice(NOUNS)}
+
+        if i % 2:
+            params['ano'] = random.choice(YEARS)
+
+        await send('GET', '/books/', params=params)
+
+    async def deep_pagination(send: Send, i: int):
+        await send('GET', '/books/', params={'skip': random.randint(size // 2, max(size - 20, size // 2)), 'limit': 20})
+
+    async def autocomplete(send: Send, i: int):
+        word = random.choice(NOUNS)
+        await send('GET', '/autocomplete/', params={'q': word[:random.randint(1, len(word))]})
+
+    async def list_romancists(send: Send, i: int):
+        await send('GET', '/romancists/', params={'nome': random.choice(LAST_NAMES)})
+
+    return {
+        'login': login,
+        'users_me': users_me,
+        'book_crud': book_crud,
+        'read_book': read_book,
+        'search_books': search_books,
+        'deep_pagination': deep_pagination,
+        'list_romancists': list_romancists,
+        'autocomplete': autocomplete,
+    }
+
+
+def use_database(engine: Engine):
+    """Serve the in-process app from `engine`, with empty caches."""
+    testing_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = testing_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    response_cache.session_factory = testing_session
+    response_cache.clear()
+    missing_ids.clear()
+    for index in prefix_indexes.values():
+        index.clear()
+
+
+async def run_size(args, engine: Engine, size: int) -> list[LoadResult]:
+    transport = None if args.url else httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url or 'http://bench', transport=transport, limits=limits, timeout=60) as client:
+        tokens = []
+
+        for user in range(min(args.concurrency, USERS)):
+            response = await client.post('/auth/token', data={'username': user_email(user + 1), 'password': PASSWORD})
+            tokens.append(response.json()['access_token'])
+
+        actions = scenarios(size, tokens)
+        results = []
+
+        for name in args.scenarios:
+            results.append(await run_actions(
+                f'{name} ({size})', client, actions[name],
+                concurrency=args.concurrency, duration=args.duration, warmup=args.warmup,
+            ))
+
+        return results
+
+
+def create_bench_engine(args) -> Engine:
+    if args.backend == 'postgres':
+        if not args.database_url:
+            sys.exit('--database-url is required with --backend postgres')
+        return create_engine(args.database_url, pool_size=args.concurrency, max_overflow=0)
+
+    path = Path(tempfile.gettempdir()) / 'madr_bench.db'
+    return register_sanitize_name(create_engine(f'sqlite:///{path}', connect_args={'check_same_thread': False, 'timeout': 30}))
+
+
+def compare(results: list[dict], baseline_path: Path, max_regression: float) -> bool:
+    """Print throughput and p99 changes against a baseline; False if one regressed too much."""
+    baseline = {item['name']: item for item in json.loads(baseline_path.read_text())['results']}
+    ok = True
+
+    print(f'\nAgainst {baseline_path}:')
+    print(f'{"scenario":<36} {"rps":>9} {"p99":>9}')
+
+    for item in results:
+        previous = baseline.get(item['name'])
+
+        if previous is None or not previous['rps'] or not previous['p99_ms']:
+            continue
+
+        rps_change = item['rps'] / previous['rps'] - 1
+        p99_change = item['p99_ms'] / previous['p99_ms'] - 1
+        regressed = rps_change < -max_regression or p99_change > max_regression
+        ok = ok and not regressed
+
+        print(f'{item["name"]:<36} {rps_change:>+9.1%} {p99_change:>+9.1%}' + ('  REGRESSION' if regressed else ''))
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('sqlite', 'postgres'), default='sqlite')
+    parser.add_argument('--database-url', help='Postgres URL of a disposable benchmark database')
+    parser.add_argument('--url', help='Load a running server instead of the in-process app')
+    parser.add_argument('--sizes', default='1000,10000', help='Comma-separated numbers of books')
+    parser.add_argument('--scenarios', default=','.join(scenarios(1, ['']).keys()))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--no-cache', action='store_true', help='Disable the response cache')
+    parser.add_argument('--output', type=Path, default=Path('benchmarks/results/latest.json'))
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--max-regression', type=float, default=0.10)
+    args = parser.parse_args()
+    args.scenarios = args.scenarios.split(',')
+
+    engine = create_bench_engine(args)
+
+    if not args.url:
+        use_database(engine)
+
+    if args.no_cache:
+        response_cache.backend = None
+
+    results = []
+
+    for size in (int(size) for size in args.sizes.split(',')):
+        print(f'Seeding {size} books on {args.backend}...')
+        seed(engine, size)
+        missing_ids.clear()
+        for index in prefix_indexes.values():
+            index.clear()
+        results.extend(asyncio.run(run_size(args, engine, size)))
+
+    print_load_results(results)
+
+    report = {
+        'backend': args.backend,
+        'target': args.url or 'in-process',
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'cache': not args.no_cache,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': [result.as_dict() for result in results],
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f'\nSaved to {args.output}')
+
+    if args.baseline and not compare(report['results'], args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Measure the overhead of the metrics instrumentation.
+
+Usage: python -m benchmarks.bench_metrics [--requests 2000]
+
+Serves the same endpoint (one SQLite query per request) through the ASGI
+stack with and without the metrics/Server-Timing middlewares and the query
+listeners, and times the raw metric operations.
+"""
+import argparse
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import _query_finished, _query_started
+from app.core.metrics import MetricsMiddleware
+from app.core.server_timing import ServerTimingMiddleware
+from benchmarks.harness import measure, print_results
+
+
+def build_client(instrumented: bool) -> TestClient:
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    app = FastAPI()
+
+    @app.get('/books/{book_id}')
+    def read_book(book_id: int):
+        with engine.connect() as connection:
+            return {'id': connection.execute(text('SELECT :id'), {'id': book_id}).scalar()}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+        app.add_middleware(ServerTimingMiddleware)
+
+    return TestClient(app)
+
+
+def set_query_listeners(enabled: bool):
+    for name, listener in (('before_cursor_execute', _query_started), ('after_cursor_execute', _query_finished)):
+        if enabled and not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+        elif not enabled and event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+
+    for instrumented in (False, True):
+        set_query_listeners(instrumented)
+        client = build_client(instrumented)
+        name = 'request, instrumented' if instrumented else 'request, no metrics'
+
+        results.append(measure(name, lambda: client.get('/books/1'), repeat=args.repeat, number=args.requests // args.repeat))
+
+    registry = CollectorRegistry()
+    counter = Counter('bench', 'Bench.', ('route',), registry=registry)
+    histogram = Histogram('bench_seconds', 'Bench.', ('route',), registry=registry)
+    results.append(measure('counter.inc', lambda: counter.labels(route='/books/{book_id}').inc(), number=10000))
+    results.append(measure('histogram.observe', lambda: histogram.labels(route='/books/{book_id}').observe(0.01), number=10000))
+
+    print_results(results)
+
+    overhead = results[1].median - results[0].median
+    print(f'\nOverhead per request: {overhead * 1e6:.1f}us ({overhead / results[0].median:.1%})')
+
+
+if __name__ == '__main__':
+    main()
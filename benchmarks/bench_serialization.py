@@ -0,0 +1,70 @@
+"""Compare the Pydantic, fast and db_json paths used by the list endpoints.
+
+Usage: python -m benchmarks.bench_serialization [--rows 1000]
+
+All paths fetch the same page from an in-memory SQLite database and
+encode it to JSON; timings are reported per row.
+"""
+import argparse
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.book import Book
+from app.models.romancist import Romancist
+from app.schemas.book import BookList, BookResponse
+from app.utils.responses import encode_rows
+from app.utils.db_json import json_body_query
+from app.utils.sanitize import register_sanitize_name
+from benchmarks.harness import measure, print_results
+
+BOOK_FIELDS = list(BookResponse.model_fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    engine = register_sanitize_name(create_engine('sqlite://'))
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        db.execute(insert(Romancist), [{'name': 'Machado de Assis'}])
+        db.execute(insert(Book), [
+            {'title': f'Livro {i}', 'year': 1800 + i % 200, 'romancist_id': 1} for i in range(args.rows)
+        ])
+        db.commit()
+
+        def orm_path() -> bytes:
+            db.expunge_all() # Hydrate new objects every time, as a request would
+            books = db.scalars(select(Book).order_by(Book.id)).all()
+            return BookList(books=books).model_dump_json().encode('utf-8')
+
+        def fast_path() -> bytes:
+            rows = db.execute(select(*[getattr(Book, field) for field in BOOK_FIELDS]).order_by(Book.id))
+            return encode_rows('books', BOOK_FIELDS, rows)
+
+        def db_json_path() -> bytes:
+            query = select(*[getattr(Book, field) for field in BOOK_FIELDS]).order_by(Book.id)
+            return db.scalar(json_body_query('books', query, BOOK_FIELDS, Book.id, 'sqlite')).encode('utf-8')
+
+        assert orm_path() == fast_path() == db_json_path()
+
+        results = [
+            measure('orm: hydrate + validate + encode', orm_path, repeat=args.repeat),
+            measure('fast: tuples + direct encode', fast_path, repeat=args.repeat),
+            measure('db_json: database builds the body', db_json_path, repeat=args.repeat),
+        ]
+
+    print(f'Per row, {args.rows} rows per page')
+    print_results(results, per=args.rows)
+
+    saved = (results[0].median - results[1].median) / args.rows
+    print(f'\nCPU saved per row: {saved * 1e6:.3f}us ({results[0].median / results[1].median:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Compare the single-process uvicorn setup with the multi-worker launcher.
+
+Usage: python -m benchmarks.bench_server [--path /books/] [--concurrency 64] [--duration 10]
+
+Starts each server on a local port against the database configured in the
+environment (.env), drives it with the same closed-loop load and prints
+throughput and latency percentiles.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.loadgen import print_load_results, run_load
+
+
+def wait_until_up(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base_url + '/')
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+
+    raise RuntimeError(f'Server at {base_url} did not start')
+
+
+def start_single(port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def start_launcher(port: int, workers: int | str) -> subprocess.Popen:
+    config = tempfile.NamedTemporaryFile('w', suffix='.toml', delete=False)
+    workers_value = f'"{workers}"' if workers == 'auto' else workers
+    config.write(f'[server]\nbind = "127.0.0.1:{port}"\nworkers = {workers_value}\npreload_app = true\nloglevel = "warning"\n')
+    config.close()
+
+    return subprocess.Popen(
+        [sys.executable, '-m', 'app.server', '--config', config.name],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def drive(name: str, base_url: str, path: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        return await run_load(name, client, lambda i: ('GET', path, {}), concurrency=concurrency, duration=duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/books/')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', default='auto')
+    args = parser.parse_args()
+
+    results = []
+    setups = [
+        ('uvicorn, 1 process', 8101, lambda port: start_single(port)),
+        (f'app.server, workers={args.workers}', 8102, lambda port: start_launcher(port, args.workers)),
+    ]
+
+    for name, port, start in setups:
+        process = start(port)
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            wait_until_up(base_url)
+            results.append(asyncio.run(drive(name, base_url, args.path, args.concurrency, args.duration)))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(f'GET {args.path}, {args.concurrency} concurrent clients, {args.duration:.0f}s, {os.cpu_count()} cores')
+    print_load_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""Generate large, reproducible catalogs and bulk-load them.
+
+Usage:
+    python -m benchmarks.dataset --database-url URL [--romancists 100000]
+        [--books 2000000] [--users 10000] [--seed 42] [--reset]
+
+The same seed always produces the same rows. Books per romancist follow a
+power law (a few prolific authors, a long tail with one or two books),
+years lean towards recent decades, and titles and names are unique after
+`sanitize_name`, so the `title_key`/`name_key` columns the database
+generates from them satisfy their unique indexes. Every user shares one
+precomputed bcrypt hash of PASSWORD.
+
+On Postgres the rows are streamed with COPY; other databases fall back to
+batched inserts. Rows get explicit ids, so the target tables must be empty
+(`--reset` drops and recreates the schema first).
+"""
+import argparse
+import io
+import random
+import sys
+import time
+from dataclasses import dataclass
+from itertools import accumulate, islice
+from typing import Iterable, Iterator
+
+from sqlalchemy import column, create_engine, func, select, table, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.security import hash_password
+from app.models.base import Base
+from app.models.book import Book
+from app.models.romancist import Romancist
+from app.models.user import User
+from app.utils.sanitize import sanitize_name
+
+PASSWORD = 'benchpassword'
+CHUNK = 50000
+
+FIRST_NAMES = (
+    'Ana', 'Beatriz', 'Carlos', 'Clarice', 'Cecilia', 'Daniel', 'Eduardo', 'Fernanda', 'Gabriel', 'Helena',
+    'Isabel', 'Joao', 'Jorge', 'Julia', 'Lucas', 'Luisa', 'Manuel', 'Maria', 'Mario', 'Paulo',
+    'Rachel', 'Rafael', 'Raquel', 'Rita', 'Rubem', 'Sofia', 'Teresa', 'Vinicius', 'Lygia', 'Graciliano',
+)
+LAST_NAMES = (
+    'Almeida', 'Alves', 'Amado', 'Andrade', 'Assis', 'Barbosa', 'Bandeira', 'Cardoso', 'Carvalho', 'Costa',
+    'Cunha', 'Dias', 'Fagundes', 'Ferreira', 'Fonseca', 'Gomes', 'Lima', 'Lispector', 'Lopes', 'Machado',
+    'Meireles', 'Melo', 'Moraes', 'Nascimento', 'Oliveira', 'Pereira', 'Queiroz', 'Ramos', 'Ribeiro', 'Rocha',
+    'Rosa', 'Santos', 'Silva', 'Souza', 'Teixeira', 'Telles', 'Veríssimo', 'Vieira',
+)
+NOUNS = (
+    'amor', 'noite', 'mar', 'casa', 'tempo', 'sol', 'vida', 'rio', 'terra', 'sombra', 'cidade', 'memoria',
+    'sertao', 'vento', 'silencio', 'janela', 'estrada', 'jardim', 'inverno', 'viagem', 'segredo', 'espelho',
+    'ilha', 'fogo', 'chuva', 'morte', 'sonho', 'porto', 'deserto', 'tarde',
+)
+ADJECTIVES = (
+    'azul', 'perdido', 'antigo', 'eterno', 'secreto', 'vermelho', 'distante', 'ultimo', 'quieto', 'selvagem',
+    'escuro', 'breve', 'infinito', 'amargo', 'claro', 'estranho', 'sagrado', 'vazio', 'novo', 'velho',
+)
+TITLE_PATTERNS = (
+    '{Noun} {adjective}',
+    'O {noun} {adjective}',
+    '{Noun} de {noun2}',
+    'A {noun} e o {noun2}',
+    'Cronicas do {noun} {adjective}',
+    'Memorias de um {noun} {adjective}',
+)
+
+
+@dataclass
+class DatasetSpec:
+    """Shape of a generated catalog; the seed makes it reproducible."""
+    romancists: int = 1000
+    books: int = 10000
+    users: int = 100
+    seed: int = 42
+    skew: float = 1.1 # Power-law exponent of books per romancist
+    oldest_year: int = 1500
+    newest_year: int = 2025
+
+
+def user_email(number: int) -> str:
+    return f'user{number}@example.com'
+
+
+class _UniqueNames:
+    """Make generated names unique after `sanitize_name` by numbering repeats."""
+
+    def __init__(self):
+        self._seen: dict[str, int] = {}
+
+    def __call__(self, name: str) -> str:
+        key = sanitize_name(name)
+        repeats = self._seen.get(key, 0)
+        self._seen[key] = repeats + 1
+
+        # Generated bases never end in a digit, so a numbered name cannot clash with a base
+        return f'{name} {repeats + 1}' if repeats else name
+
+
+def _title(rng: random.Random) -> str:
+    noun, noun2 = rng.sample(NOUNS, 2)
+
+    return rng.choice(TITLE_PATTERNS).format(
+        Noun=noun.capitalize(), noun=noun, noun2=noun2, adjective=rng.choice(ADJECTIVES),
+    )
+
+
+def _year(rng: random.Random, spec: DatasetSpec) -> int:
+    if rng.random() < 0.85: # Most of the catalog is modern; the rest spreads over older centuries
+        year = round(rng.gauss(spec.newest_year - 30, 25))
+    else:
+        year = rng.randint(spec.oldest_year, spec.newest_year)
+
+    return min(max(year, spec.oldest_year), spec.newest_year)
+
+
+def romancist_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    """(id, name) for every romancist."""
+    rng = random.Random(f'{spec.seed}:romancists')
+    unique = _UniqueNames()
+
+    for romancist_id in range(1, spec.romancists + 1):
+        yield romancist_id, unique(f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}')
+
+
+def book_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    """(id, title, year, romancist_id) for every book."""
+    rng = random.Random(f'{spec.seed}:books')
+    unique = _UniqueNames()
+
+    # Zipf-like weights over shuffled ids, so prolific authors are spread across the table
+    authors = list(range(1, spec.romancists + 1))
+    rng.shuffle(authors)
+    cumulative = list(accumulate(1 / rank ** spec.skew for rank in range(1, spec.romancists + 1)))
+
+    for start in range(0, spec.books, CHUNK):
+        count = min(CHUNK, spec.books - start)
+        owners = rng.choices(authors, cum_weights=cumulative, k=count)
+
+        for offset, romancist_id in enumerate(owners):
+            yield start + offset + 1, unique(_title(rng)), _year(rng, spec), romancist_id
+
+
+def user_rows(spec: DatasetSpec, password_hash: str) -> Iterator[tuple]:
+    """(id, username, email, password_hash) for every user."""
+    for number in range(1, spec.users + 1):
+        yield number, f'user{number}', user_email(number), password_hash
+
+
+def _copy_text(value) -> str:
+    """Escape a value for COPY's text format."""
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy(connection: Connection, table_name: str, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    cursor = connection.connection.driver_connection.cursor()
+    statement = f'COPY {table_name} ({", ".join(columns)}) FROM STDIN'
+    total = 0
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, CHUNK)):
+        buffer = io.StringIO(''.join('\t'.join(map(_copy_text, row)) + '\n' for row in chunk))
+        cursor.copy_expert(statement, buffer)
+        total += len(chunk)
+
+    return total
+
+
+def _insert(connection: Connection, table_name: str, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    target = table(table_name, *(column(name) for name in columns))
+    total = 0
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, CHUNK)):
+        connection.execute(target.insert(), [dict(zip(columns, row)) for row in chunk])
+        total += len(chunk)
+
+    return total
+
+
+def load(engine: Engine, spec: DatasetSpec, password_hash: str | None = None) -> dict[str, int]:
+    """Write the dataset in one transaction; returns the row count per table."""
+    password_hash = password_hash or hash_password(PASSWORD) # One bcrypt call for every user
+    postgres = engine.dialect.name == 'postgresql'
+    write = _copy if postgres else _insert
+    tables = (
+        (Romancist.__tablename__, ('id', 'name'), romancist_rows(spec)),
+        (Book.__tablename__, ('id', 'title', 'year', 'romancist_id'), book_rows(spec)),
+        (User.__tablename__, ('id', 'username', 'email', 'password_hash'), user_rows(spec, password_hash)),
+    )
+    counts = {}
+
+    with engine.begin() as connection:
+        for table_name, columns, rows in tables:
+            counts[table_name] = write(connection, table_name, columns, rows)
+
+            # Explicit ids leave the serial sequences behind; move them past the new rows
+            if postgres:
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), GREATEST(MAX(id), 1)) FROM {table_name}"
+                ))
+
+    if postgres:
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text('ANALYZE'))
+
+    return counts
+
+
+def is_empty(engine: Engine) -> bool:
+    with engine.connect() as connection:
+        return all(
+            connection.scalar(select(func.count()).select_from(model.__table__)) == 0
+            for model in (Romancist, Book, User)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--romancists', type=int, default=DatasetSpec.romancists)
+    parser.add_argument('--books', type=int, default=DatasetSpec.books)
+    parser.add_argument('--users', type=int, default=DatasetSpec.users)
+    parser.add_argument('--seed', type=int, default=DatasetSpec.seed)
+    parser.add_argument('--skew', type=float, default=DatasetSpec.skew, help='Power-law exponent of books per romancist')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate the schema first')
+    args = parser.parse_args()
+
+    spec = DatasetSpec(romancists=args.romancists, books=args.books, users=args.users, seed=args.seed, skew=args.skew)
+    engine = create_engine(args.database_url)
+
+    if args.reset:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+    elif not is_empty(engine):
+        sys.exit('The database already has data; use --reset to replace it')
+
+    started = time.perf_counter()
+    counts = load(engine, spec)
+    elapsed = time.perf_counter() - started
+
+    for table_name, count in counts.items():
+        print(f'{table_name:<12} {count:>12,}')
+    print(f'Loaded in {elapsed:.1f}s ({sum(counts.values()) / elapsed:,.0f} rows/s); users log in with {PASSWORD!r}')
+
+
+if __name__ == '__main__':
+    main()
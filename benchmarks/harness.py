@@ -0,0 +1,118 @@
+"""Small timing harness shared by the benchmark scripts."""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+
+@dataclass
+class Result:
+    """Timings of one benchmark, in seconds per call."""
+    name: str
+    samples: list[float] = field(default_factory=list)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    @property
+    def p95(self) -> float:
+        return statistics.quantiles(self.samples, n=20)[-1] if len(self.samples) > 1 else self.samples[0]
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'mean': self.mean,
+            'median': self.median,
+            'stdev': self.stdev,
+            'p95': self.p95,
+            'samples': len(self.samples),
+        }
+
+
+def measure(name: str, fn: Callable[[], object], repeat: int = 20, number: int = 1, warmup: int = 3) -> Result:
+    """Time `fn` `repeat` times (each sample averages `number` calls) after `warmup` calls."""
+    for _ in range(warmup):
+        fn()
+
+    result = Result(name)
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        result.samples.append((time.perf_counter() - start) / number)
+
+    return result
+
+
+def print_results(results: list[Result], unit: float = 1e-6, unit_name: str = 'us', per: int = 1):
+    """Print a table of results, optionally divided by `per` (e.g. rows per call)."""
+    print(f'{"benchmark":<40} {"median":>12} {"mean":>12} {"p95":>12} {"stdev":>10}')
+
+    for result in results:
+        values = [value / unit / per for value in (result.median, result.mean, result.p95, result.stdev)]
+        print(f'{result.name:<40} ' + ' '.join(f'{value:>10.3f}{unit_name}' for value in values[:3]) + f' {values[3]:>8.3f}{unit_name}')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def save_results(results: list[Result], path: Path, **metadata):
+    """Write results as JSON with the commit and Python version, for later comparison."""
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        **metadata,
+        'results': [result.as_dict() for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+
+
+def compare_results(results: list[Result], baseline_path: Path, max_regression: float = 0.10) -> bool:
+    """Print median changes against a saved run; False if one slowed down by more than `max_regression`.
+
+    A change within the noise of either run (their standard deviation) is
+    never reported as a regression.
+    """
+    baseline = {item['name']: item for item in json.loads(baseline_path.read_text())['results']}
+    ok = True
+
+    print(f'\nAgainst {baseline_path}:')
+    print(f'{"benchmark":<40} {"baseline":>12} {"now":>12} {"change":>9}')
+
+    for result in results:
+        previous = baseline.get(result.name)
+
+        if previous is None or not previous['median']:
+            continue
+
+        change = result.median / previous['median'] - 1
+        noise = max(result.stdev, previous['stdev'])
+        regressed = change > max_regression and result.median - previous['median'] > noise
+        ok = ok and not regressed
+
+        print(
+            f'{result.name:<40} {previous["median"] * 1e6:>10.3f}us {result.median * 1e6:>10.3f}us {change:>+9.1%}'
+            + ('  REGRESSION' if regressed else '')
+        )
+
+    return ok
@@ -0,0 +1,123 @@
+"""Closed-loop HTTP load generator shared by the load benchmarks."""
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+
+
+@dataclass
+class LoadResult:
+    """Latencies (seconds) and status counts of one load run."""
+    name: str
+    duration: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    @property
+    def rps(self) -> float:
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'rps': self.rps,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'mean_ms': statistics.fmean(self.latencies) * 1000 if self.latencies else 0.0,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+
+# A request factory returns (method, url, keyword arguments for httpx)
+RequestFactory = Callable[[int], tuple[str, str, dict]]
+
+# Sends one request and records its latency and status
+Send = Callable[..., Awaitable[httpx.Response]]
+
+# A scenario action performs one iteration (one or more requests) through `send`
+Action = Callable[[Send, int], Awaitable[object]]
+
+
+async def run_actions(
+    name: str,
+    client: httpx.AsyncClient,
+    action: Action,
+    concurrency: int = 16,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+) -> LoadResult:
+    """Run `concurrency` virtual users in a closed loop; only requests after `warmup` are recorded."""
+    result = LoadResult(name)
+    started = time.perf_counter()
+    record_from = started + warmup
+    stop_at = record_from + duration
+    counter = 0
+
+    async def send(method: str, url: str, **kwargs) -> httpx.Response | None:
+        sent_at = time.perf_counter()
+
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            if sent_at >= record_from:
+                result.errors += 1
+            return None
+
+        if sent_at >= record_from:
+            result.latencies.append(time.perf_counter() - sent_at)
+            result.statuses[response.status_code] = result.statuses.get(response.status_code, 0) + 1
+
+        return response
+
+    async def user():
+        nonlocal counter
+
+        while time.perf_counter() < stop_at:
+            counter += 1
+            await action(send, counter)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    result.duration = duration
+
+    return result
+
+
+async def run_load(
+    name: str,
+    client: httpx.AsyncClient,
+    make_request: RequestFactory,
+    concurrency: int = 16,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+) -> LoadResult:
+    """Drive single requests built by `make_request`; see `run_actions`."""
+    async def action(send: Send, i: int):
+        method, url, kwargs = make_request(i)
+        return await send(method, url, **kwargs)
+
+    return await run_actions(name, client, action, concurrency, duration, warmup)
+
+
+def print_load_results(results: list[LoadResult]):
+    """Print one line per load run."""
+    print(f'{"scenario":<36} {"rps":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errors":>7}')
+
+    for result in results:
+        data = result.as_dict()
+        print(
+            f'{result.name:<36} {data["rps"]:>9.1f} {data["p50_ms"]:>9.2f} '
+            f'{data["p95_ms"]:>9.2f} {data["p99_ms"]:>9.2f} {data["errors"]:>7}'
+        )
@@ -1,19 +1,26 @@
+import os
+import time
+from contextlib import contextmanager
+
 import pytest
 import factory
 
 from fastapi.testclient import TestClient
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core.database import get_db, Base
+from app.core.cache import response_cache
+from app.core.negative_cache import missing_ids
+from app.core.prefix_index import prefix_indexes
 from app.main import app
 from app.models.user import User
 from app.models.romancist import Romancist
 from app.models.book import Book
 from app.core.security import hash_password
-from app.utils.sanitize import sanitize_name
+from app.utils.sanitize import register_sanitize_name, sanitize_name
 
 
 #  Set up a database for testing
@@ -25,6 +32,7 @@ engine = create_engine(
     connect_args={'check_same_thread': False}, # Required for SQLite to work with multiple threads in the FastAPI environment
     poolclass=StaticPool,
 )
+register_sanitize_name(engine) # The generated name keys call it on SQLite
 
 # Create SessionLocal for testing that binds to the testing engine
 Testing_SessionLocal = sessionmaker(
@@ -77,6 +85,13 @@ def client_fixture(session):
     # Tell FastAPI to use the override function for the get_db dependency
     app.dependency_overrides[get_db] = override_get_db
 
+    # Start from an empty response cache whose background refreshes use the testing database
+    response_cache.clear()
+    response_cache.session_factory = Testing_SessionLocal
+    missing_ids.clear()
+    for index in prefix_indexes.values():
+        index.clear()
+
     # Create a TestClient that will be used in the tests
     client = TestClient(app)
 
@@ -87,6 +102,47 @@ def client_fixture(session):
     app.dependency_overrides.clear()
 
 
+# Wall-clock budgets depend on the machine and its load, so they only fail
+# a run that opts in (e.g. a dedicated perf job): QUERY_TIME_BUDGETS=1 pytest
+ENFORCE_TIME_BUDGETS = os.environ.get('QUERY_TIME_BUDGETS', '') not in ('', '0')
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test when a block runs more SQL statements, or takes longer, than its budget.
+
+    Usage: `with query_budget(2, max_ms=200): client.get(...)`
+    The statements are captured on the testing engine and listed in the failure.
+    `max_ms` is only enforced when QUERY_TIME_BUDGETS is set.
+    """
+
+    @contextmanager
+    def budget(max_queries: int, max_ms: float | None = None):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        started = time.perf_counter()
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if len(statements) > max_queries:
+            listing = '\n'.join(f'  {i}. {" ".join(statement.split())}' for i, statement in enumerate(statements, 1))
+            pytest.fail(f'{len(statements)} queries ran, budget is {max_queries}:\n{listing}')
+
+        if ENFORCE_TIME_BUDGETS and max_ms is not None and elapsed_ms > max_ms:
+            pytest.fail(f'Took {elapsed_ms:.1f} ms, budget is {max_ms} ms')
+
+    return budget
+
+
 @pytest.fixture
 def user(session):
     """Create a sample user in the database."""
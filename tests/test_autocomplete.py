@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+from app.core.config import settings
+from app.models.book import Book
+from app.models.romancist import Romancist
+
+
+@pytest.fixture
+def catalog(session):
+    """Create romancists and books whose keys share prefixes."""
+    machado = Romancist(name='Machado de Assis')
+    session.add_all([machado, Romancist(name='Mário de Andrade'), Romancist(name='Clarice Lispector')])
+    session.flush()
+
+    session.add_all([
+        Book(title='Memórias Póstumas de Brás Cubas', year=1881, romancist_id=machado.id),
+        Book(title='Memorial de Aires', year=1908, romancist_id=machado.id),
+        Book(title='Dom Casmurro', year=1899, romancist_id=machado.id),
+        Book(title='100% Machado', year=2000, romancist_id=machado.id),
+    ])
+    session.commit()
+
+    return machado
+
+
+@pytest.fixture(params=[False, True], ids=['database', 'memory'])
+def memory_index(request, monkeypatch):
+    """Run the test against the database prefix query and the in-memory index."""
+    monkeypatch.setattr(settings, 'AUTOCOMPLETE_MEMORY_INDEX', request.param)
+    return request.param
+
+
+def test_autocomplete_prefix_matches(client, catalog, memory_index):
+    """Test that titles and names starting with the prefix are returned in key order."""
+    response = client.get('/autocomplete/?q=  MEM')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'books': [{'id': 2, 'title': 'Memorial de Aires'}, {'id': 1, 'title': 'Memórias Póstumas de Brás Cubas'}],
+        'romancists': [],
+    }
+
+    response = client.get('/autocomplete/?q=ma&limit=1')
+
+    assert response.json() == {'books': [], 'romancists': [{'id': 1, 'name': 'Machado de Assis'}]}
+
+def test_autocomplete_treats_wildcards_literally(client, catalog, memory_index):
+    """Test that % and _ in the prefix are not LIKE wildcards."""
+    assert client.get('/autocomplete/?q=100%25').json()['books'] == [{'id': 4, 'title': '100% Machado'}]
+    assert client.get('/autocomplete/?q=%25').json()['books'] == []
+    assert client.get('/autocomplete/?q=_').json() == {'books': [], 'romancists': []}
+
+def test_autocomplete_follows_writes(client, token: str, catalog, memory_index):
+    """Test that created, renamed and deleted books are reflected in the suggestions."""
+    headers = {'Authorization': f'Bearer {token}'}
+    assert len(client.get('/autocomplete/?q=me').json()['books']) == 2
+
+    client.post('/books/', json={'title': 'Memorial do Convento', 'year': 1982, 'romancist_id': catalog.id}, headers=headers)
+    client.put('/books/2', json={'title': 'Esaú e Jacó'}, headers=headers)
+    client.delete('/books/1', headers=headers)
+
+    assert client.get('/autocomplete/?q=me').json()['books'] == [{'id': 5, 'title': 'Memorial do Convento'}]
+    assert client.get('/autocomplete/?q=esa').json()['books'] == [{'id': 2, 'title': 'Esaú e Jacó'}]
+
+def test_autocomplete_validation(client):
+    """Test that an empty prefix or an excessive limit is rejected, and blanks match nothing."""
+    assert client.get('/autocomplete/?q=').status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get(f'/autocomplete/?q=a&limit={settings.AUTOCOMPLETE_MAX_RESULTS + 1}').status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get('/autocomplete/?q=%20%20').json() == {'books': [], 'romancists': []}
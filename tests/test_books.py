@@ -3,6 +3,10 @@ from http import HTTPStatus
 from app.models.book import Book
 from app.schemas.book import BookCreate, BookResponse, BookUpdate, BookList
 from app.utils.sanitize import sanitize_name
+from app.core.cache import response_cache
+from app.core.config import settings
+
+from sqlalchemy import insert, select, update
 
 from pprint import pprint
 
@@ -255,4 +259,260 @@ def test_delete_book_unauthorized(client, book: Book):
     response = client.delete(f'/books/{book.id}')
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
-    assert response.json()['detail'] == 'Not authenticated'
\ No newline at end of file
+    assert response.json()['detail'] == 'Not authenticated'
+
+
+def test_create_book_keeps_display_casing(client, session, token: str, romancist):
+    """Test that the title keeps its casing while the normalized key is indexed."""
+    response = client.post(
+        '/books/',
+        json={'title': '  Dom   Casmurro ', 'year': 1899, 'romancist_id': romancist.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['title'] == 'Dom Casmurro'
+
+    book_in_db = session.query(Book).filter_by(title_key='dom casmurro').first()
+
+    assert book_in_db is not None
+
+def test_create_book_conflict_ignores_casing(client, token: str, book: Book):
+    """Test that titles differing only by casing/spacing are duplicates."""
+    response = client.post(
+        '/books/',
+        json={'title': 'TEST   book', 'year': 2020, 'romancist_id': book.romancist_id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+def test_bulk_insert_fills_title_key(session, romancist):
+    """Test that Core bulk inserts bypassing the routers still get a title_key."""
+    session.execute(
+        insert(Book),
+        [
+            {'title': 'Quincas  Borba', 'year': 1891, 'romancist_id': romancist.id},
+            {'title': 'Helena', 'year': 1876, 'romancist_id': romancist.id},
+        ],
+    )
+    session.commit()
+
+    keys = session.scalars(select(Book.title_key).order_by(Book.year)).all()
+
+    assert keys == ['helena', 'quincas borba']
+
+def test_read_book_not_modified(client, book: Book):
+    """Test that a matching If-None-Match returns 304 without a body."""
+    response = client.get(f'/books/{book.id}')
+    etag = response.headers['ETag']
+
+    response = client.get(f'/books/{book.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert response.content == b''
+
+def test_read_books_etag_changes_after_write(client, token: str, book: Book):
+    """Test that a write to books invalidates the list ETag."""
+    etag = client.get('/books/').headers['ETag']
+
+    client.put(
+        f'/books/{book.id}',
+        json={'year': 1999},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    response = client.get('/books/', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+    assert response.json()['books'][0]['year'] == 1999
+
+def test_etag_follows_content_not_process(client, session, book: Book):
+    """Test that the ETag depends only on the body, so writes outside the app change it too."""
+    etag = client.get(f'/books/{book.id}').headers['ETag']
+
+    response_cache.clear() # Another worker, or an expired cache, renders the body again
+
+    assert client.get(f'/books/{book.id}').headers['ETag'] == etag
+
+    session.execute(update(Book).where(Book.id == book.id).values(year=1777)) # e.g. psql
+    session.commit()
+    response_cache.clear()
+
+    response = client.get(f'/books/{book.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+
+def test_read_books_fast_path_matches_orm_path(client, session, romancist, monkeypatch):
+    """Test that the fast list path produces the same bytes as the Pydantic path."""
+    session.add_all([
+        Book(title=f'Livro nº {i} "Ação" \\ / {chr(0x1F4D6)}', year=1900 + i, romancist_id=romancist.id)
+        for i in range(25)
+    ])
+    session.commit()
+
+    bodies = {}
+    for mode in ('orm', 'fast'):
+        monkeypatch.setattr(settings, 'BOOKS_LIST_MODE', mode)
+        response_cache.clear()
+        bodies[mode] = client.get('/books/?skip=3&limit=10&titulo=livro').content
+
+    assert bodies['fast'] == bodies['orm']
+    assert len(BookList.model_validate_json(bodies['fast']).books) == 10
+
+def test_read_books_db_json_matches_orm_path(client, session, romancist, monkeypatch):
+    """Test that the database-built body holds the same data as the Pydantic path."""
+    session.add_all([
+        Book(title=f'Livro "{i}" ç', year=1900 + i, romancist_id=romancist.id)
+        for i in range(25)
+    ])
+    session.commit()
+
+    for url in ('/books/?skip=5&limit=7', '/books/?ano=1901', '/books/?titulo=nada'):
+        bodies = {}
+        for mode in ('orm', 'db_json'):
+            monkeypatch.setattr(settings, 'BOOKS_LIST_MODE', mode)
+            response_cache.clear()
+            bodies[mode] = client.get(url).json()
+
+        assert bodies['db_json'] == bodies['orm']
+
+def test_read_books_sparse_fields(client, book: Book, monkeypatch):
+    """Test that ?fields limits the list payload in every list mode."""
+    for mode in ('orm', 'fast', 'db_json'):
+        monkeypatch.setattr(settings, 'BOOKS_LIST_MODE', mode)
+        response_cache.clear()
+
+        response = client.get('/books/?fields=title,id')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'books': [{'id': book.id, 'title': book.title}]}
+
+def test_read_book_sparse_fields(client, book: Book):
+    """Test that ?fields limits the payload of a single book."""
+    response = client.get(f'/books/{book.id}?fields=year')
+
+    assert response.json() == {'year': book.year}
+
+def test_read_books_invalid_fields(client):
+    """Test that unknown fields are rejected."""
+    response = client.get('/books/?fields=id,isbn')
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert 'isbn' in response.json()['detail']
+
+def test_read_books_by_ids(client, session, romancist, query_budget):
+    """Test that ?ids returns the books in request order with one query and lists missing ids."""
+    books = [Book(title=f'Livro {i}', year=2000 + i, romancist_id=romancist.id) for i in range(3)]
+    session.add_all(books)
+    session.commit()
+
+    # The id range of the table is loaded once, then one query fetches every book
+    with query_budget(2):
+        response = client.get(f'/books/?ids={books[2].id},9999,{books[0].id},{books[2].id}&fields=id,year')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'books': [{'id': books[2].id, 'year': 2002}, {'id': books[0].id, 'year': 2000}],
+        'missing': [9999],
+    }
+
+def test_read_books_by_ids_limits(client, monkeypatch):
+    """Test that ?ids rejects malformed and oversized id lists."""
+    monkeypatch.setattr(settings, 'MULTI_GET_MAX_IDS', 3)
+
+    assert client.get('/books/?ids=1,a').status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get('/books/?ids=,').status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get('/books/?ids=1,2,3,4').status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+def test_update_books_by_ids(client, session, token: str, romancists, query_budget):
+    """Test that a bulk update moves the given books with one UPDATE and reports missing ids."""
+    books = [Book(title=f'Livro {i}', year=2000, romancist_id=romancists[0].id) for i in range(3)]
+    session.add_all(books)
+    session.commit()
+
+    with query_budget(4): # User, romancist id range and lookup, one UPDATE ... RETURNING
+        response = client.patch(
+            '/books/',
+            json={'ids': [books[2].id, 9999, books[0].id], 'changes': {'romancist_id': romancists[1].id}},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'updated': [books[2].id, books[0].id], 'missing': [9999]}
+
+    romancist_ids = session.scalars(select(Book.romancist_id).order_by(Book.id)).all()
+    assert romancist_ids == [romancists[1].id, romancists[0].id, romancists[1].id]
+    assert client.get(f'/books/{books[2].id}').json()['romancist_id'] == romancists[1].id
+
+def test_update_books_by_filter(client, session, token: str, romancist):
+    """Test that a bulk update can select books by romancist and year."""
+    session.add_all([Book(title=f'Livro {i}', year=1990 + i % 2, romancist_id=romancist.id) for i in range(4)])
+    session.commit()
+
+    response = client.patch(
+        '/books/',
+        json={'filter': {'romancist_id': romancist.id, 'year': 1991}, 'changes': {'year': 1992}},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['updated']) == 2
+    assert client.get('/books/?ano=1992').json()['books'] == client.get('/books/?ids=' + ','.join(map(str, response.json()['updated']))).json()['books']
+
+def test_bulk_books_rejects_unsafe_selections(client, token: str, romancist, monkeypatch):
+    """Test that bulk operations need a bounded, explicit selection."""
+    monkeypatch.setattr(settings, 'BULK_MAX_BOOKS', 2)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    for body in (
+        {'changes': {'year': 2000}}, # No selection
+        {'ids': [1], 'filter': {'year': 2000}, 'changes': {'year': 2000}}, # Both
+        {'filter': {}, 'changes': {'year': 2000}}, # Whole catalog
+        {'ids': [1, 2, 3], 'changes': {'year': 2000}}, # Too many ids
+        {'ids': [1], 'changes': {}}, # Nothing to change
+    ):
+        assert client.patch('/books/', json=body, headers=headers).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    bad_romancist = client.patch('/books/', json={'ids': [1], 'changes': {'romancist_id': 9999}}, headers=headers)
+    assert bad_romancist.status_code == HTTPStatus.BAD_REQUEST
+
+    assert client.patch('/books/', json={'ids': [1], 'changes': {'year': 2000}}).status_code == HTTPStatus.UNAUTHORIZED
+
+def test_delete_books(client, session, token: str, romancist, monkeypatch):
+    """Test that a bulk delete removes books by ids or filter and refuses oversized filters."""
+    books = [Book(title=f'Livro {i}', year=2000 + i % 2, romancist_id=romancist.id) for i in range(5)]
+    session.add_all(books)
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.request('DELETE', '/books/', json={'ids': [books[0].id, 9999]}, headers=headers)
+
+    assert response.json() == {'deleted': [books[0].id], 'missing': [9999]}
+    assert client.get(f'/books/{books[0].id}').status_code == HTTPStatus.NOT_FOUND
+
+    monkeypatch.setattr(settings, 'BULK_MAX_BOOKS', 1)
+    response = client.request('DELETE', '/books/', json={'filter': {'year': 2001}}, headers=headers)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    monkeypatch.setattr(settings, 'BULK_MAX_BOOKS', 10)
+    response = client.request('DELETE', '/books/', json={'filter': {'year': 2001}}, headers=headers)
+
+    assert response.json() == {'deleted': [books[1].id, books[3].id], 'missing': []}
+    assert client.get('/books/').json()['books'] == client.get(f'/books/?ids={books[2].id},{books[4].id}').json()['books']
+
+def test_core_update_regenerates_title_key(session, book: Book):
+    """Test that a Core UPDATE of the title, bypassing the ORM, also updates title_key."""
+    session.execute(update(Book).where(Book.id == book.id).values(title='  Dom   CASMURRO '))
+    session.commit()
+
+    assert session.scalar(select(Book.title_key).where(Book.id == book.id)) == 'dom casmurro'
+
+    session.execute(update(Book).where(Book.id == book.id).values(year=1899)) # Other columns keep the key
+    session.commit()
+
+    assert session.scalar(select(Book.title_key).where(Book.id == book.id)) == 'dom casmurro'
@@ -0,0 +1,86 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.cache import CacheEntry, MemoryBackend, ResponseCache, cache_key
+from app.models.book import Book
+
+
+def make_cache(ttl: float = 30.0, stale: float = 300.0) -> ResponseCache:
+    """Create an isolated cache whose background refreshes use a dummy session."""
+    return ResponseCache(MemoryBackend(max_entries=2), ttl=ttl, stale=stale, session_factory=FakeSession)
+
+
+class FakeSession:
+    """Stand-in session for loaders that do not touch the database."""
+    def close(self):
+        pass
+
+
+def test_cache_key_is_order_independent():
+    """Test that keys only depend on parameter names and values."""
+    assert cache_key('books', 'read_books', skip=0, limit=20) == cache_key('books', 'read_books', limit=20, skip=0)
+
+def test_memory_backend_evicts_least_recently_used():
+    """Test that the LRU drops the oldest entry once full."""
+    backend = MemoryBackend(max_entries=2)
+
+    for key in ('a', 'b', 'c'):
+        backend.set(key, CacheEntry(key.encode(), time.time()), retention=60)
+
+    assert backend.get('a') is None
+    assert backend.get('c').value == b'c'
+
+def test_fetch_serves_fresh_entries_without_loading():
+    """Test that a fresh entry is returned without calling the loader again."""
+    cache = make_cache()
+    calls = []
+
+    def loader(db):
+        calls.append(db)
+        return b'{}'
+
+    assert cache.fetch('books:x', loader, FakeSession()) == b'{}'
+    assert cache.fetch('books:x', loader, FakeSession()) == b'{}'
+    assert len(calls) == 1
+
+def test_fetch_serves_stale_entry_and_refreshes_in_background():
+    """Test stale-while-revalidate: the old body is served while a refresh runs."""
+    cache = make_cache(ttl=0.0)
+    cache.backend.set('books:x', CacheEntry(b'old', time.time() - 1), retention=60)
+
+    assert cache.fetch('books:x', lambda db: b'new', FakeSession()) == b'old'
+
+    deadline = time.monotonic() + 5
+    while cache.backend.get('books:x').value == b'old' and time.monotonic() < deadline:
+        time.sleep(0.01) # Wait for the background refresh
+
+    assert cache.backend.get('books:x').value == b'new'
+
+def test_fetch_serves_stale_entry_when_database_is_down():
+    """Test that a stale entry is served when the loader cannot reach the database."""
+    cache = make_cache(ttl=0.0, stale=0.0)
+    cache.backend.set('books:x', CacheEntry(b'old', time.time() - 1), retention=60)
+
+    def loader(db):
+        raise OperationalError('SELECT 1', {}, Exception('connection refused'))
+
+    assert cache.fetch('books:x', loader, FakeSession()) == b'old'
+
+    with pytest.raises(OperationalError):
+        cache.fetch('books:y', loader, FakeSession())
+
+def test_book_write_invalidates_cached_reads(client, session, token: str, book: Book):
+    """Test that the write routes drop cached book responses."""
+    assert client.get(f'/books/{book.id}').json()['year'] == 2025
+
+    response = client.put(
+        f'/books/{book.id}',
+        json={'year': 1990},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    assert client.get(f'/books/{book.id}').json()['year'] == 1990
@@ -0,0 +1,116 @@
+import gzip
+import threading
+from http import HTTPStatus
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.models.book import Book
+
+
+def add_books(session, romancist, count: int = 60):
+    """Add enough books for the list body to pass the compression threshold."""
+    session.add_all([
+        Book(title=f'Compressible Book {i}', year=1900 + i, romancist_id=romancist.id)
+        for i in range(count)
+    ])
+    session.commit()
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation."""
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding('') is None
+
+def test_large_list_is_gzipped(client, session, romancist):
+    """Test that a large list body is compressed and tagged for caches."""
+    add_books(session, romancist)
+
+    response = client.get('/books/?limit=100', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'].endswith('-gzip"')
+    assert len(response.json()['books']) == 60
+
+def test_small_body_is_not_compressed(client, book: Book):
+    """Test that bodies under the size threshold are sent as is."""
+    response = client.get(f'/books/{book.id}', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+
+def test_compressed_body_is_reused(client, session, romancist, monkeypatch):
+    """Test that hot responses are compressed once and served precompressed."""
+    add_books(session, romancist, count=70) # A body no other test sends: ETags, and so reuse, follow the content
+    calls = []
+    original_compress = gzip.compress
+
+    def counting_compress(data, compresslevel, mtime):
+        calls.append(data)
+        return original_compress(data, compresslevel=compresslevel, mtime=mtime)
+
+    monkeypatch.setattr(compression.gzip, 'compress', counting_compress)
+
+    for _ in range(3):
+        client.get('/books/?limit=99', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(calls) == 1
+
+def test_compressed_etag_revalidates(client, session, romancist):
+    """Test that an ETag with an encoding suffix yields a 304 carrying that same ETag."""
+    add_books(session, romancist)
+
+    etag = client.get('/books/', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    response = client.get('/books/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+def test_uncompressed_etag_revalidates_unsuffixed(client, book: Book):
+    """Test that a 304 for an uncompressed representation keeps the plain ETag."""
+    etag = client.get(f'/books/{book.id}', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get(f'/books/{book.id}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not etag.endswith('-gzip"')
+
+def test_large_body_is_compressed_off_the_event_loop(monkeypatch):
+    """Test that bodies above the thread threshold are compressed in a worker thread."""
+    app = FastAPI()
+
+    @app.get('/small')
+    async def small():
+        return {'padding': 'x' * 2048}
+
+    @app.get('/large')
+    async def large():
+        return {'padding': 'x' * 8192}
+
+    app.add_middleware(CompressionMiddleware, thread_min_size=4096)
+    threads = []
+    original_compress = gzip.compress
+
+    def recording_compress(data, compresslevel, mtime):
+        threads.append(threading.current_thread())
+        return original_compress(data, compresslevel=compresslevel, mtime=mtime)
+
+    monkeypatch.setattr(compression.gzip, 'compress', recording_compress)
+
+    with TestClient(app) as client:
+        loop_thread = client.portal.call(threading.current_thread)
+
+        small_response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        large_response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert small_response.headers['Content-Encoding'] == 'gzip'
+    assert large_response.json() == {'padding': 'x' * 8192}
+    assert threads[0] is loop_thread
+    assert threads[1] is not loop_thread
@@ -0,0 +1,48 @@
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from app.models.book import Book
+from app.models.romancist import Romancist
+from app.models.user import User
+from app.utils.sanitize import sanitize_name
+from benchmarks.dataset import DatasetSpec, book_rows, load, romancist_rows
+
+
+SPEC = DatasetSpec(romancists=200, books=3000, users=5, seed=7)
+
+
+def test_same_seed_generates_same_rows():
+    assert list(book_rows(SPEC)) == list(book_rows(SPEC))
+    assert list(romancist_rows(SPEC)) == list(romancist_rows(SPEC))
+    assert list(book_rows(SPEC)) != list(book_rows(DatasetSpec(romancists=200, books=3000, seed=8)))
+
+
+def test_names_are_unique_after_sanitizing():
+    books = list(book_rows(SPEC))
+    romancists = list(romancist_rows(SPEC))
+
+    assert len({sanitize_name(title) for _, title, _, _ in books}) == SPEC.books
+    assert len({sanitize_name(name) for _, name in romancists}) == SPEC.romancists
+
+
+def test_books_per_romancist_are_skewed():
+    per_author = Counter(romancist_id for *_, romancist_id in book_rows(SPEC))
+    counts = sorted(per_author.values(), reverse=True)
+
+    # The most prolific author outweighs the median author many times over
+    assert counts[0] > 20 * counts[len(counts) // 2]
+    assert all(SPEC.oldest_year <= year <= SPEC.newest_year for _, _, year, _ in book_rows(SPEC))
+
+
+def test_load_writes_every_table(session):
+    counts = load(session.get_bind(), SPEC, password_hash='hash')
+
+    assert counts == {'romancists': 200, 'books': 3000, 'users': 5}
+    assert session.scalar(select(func.count()).select_from(Book)) == 3000
+    assert session.scalar(select(func.count()).select_from(Romancist)) == 200
+    assert session.scalar(select(User.password_hash).limit(1)) == 'hash'
+
+    # The key columns are generated by the database from the loaded names
+    title, title_key = session.execute(select(Book.title, Book.title_key).where(Book.id == 1)).one()
+    assert title_key == sanitize_name(title)
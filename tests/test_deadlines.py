@@ -0,0 +1,62 @@
+import asyncio
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.deadlines import request_budget_ms, statement_timeout_handler
+
+
+def make_request(route_name: str, headers: dict[str, str] | None = None) -> Request:
+    """Build a routed request as seen by the get_db dependency."""
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        'route': SimpleNamespace(name=route_name),
+    })
+
+@pytest.fixture
+def budgets(monkeypatch):
+    monkeypatch.setattr(settings, 'DB_STATEMENT_TIMEOUT_MS', 10000)
+    monkeypatch.setattr(settings, 'DB_ROUTE_TIMEOUTS_MS', {'read_books': 3000})
+
+
+def test_route_budget_overrides_the_default(budgets):
+    """Test that routes listed in DB_ROUTE_TIMEOUTS_MS get their own budget."""
+    assert request_budget_ms(make_request('read_books')) == 3000
+    assert request_budget_ms(make_request('read_book')) == 10000
+
+def test_header_can_only_narrow_the_budget(budgets):
+    """Test that a client deadline shortens the budget but never extends it."""
+    header = settings.DEADLINE_HEADER
+
+    assert request_budget_ms(make_request('read_books', {header: '500'})) == 500
+    assert request_budget_ms(make_request('read_books', {header: '60000'})) == 3000
+    assert request_budget_ms(make_request('read_books', {header: 'soon'})) == 3000
+
+def test_no_budget_when_disabled(monkeypatch):
+    """Test that a zero timeout leaves statements unbounded."""
+    monkeypatch.setattr(settings, 'DB_STATEMENT_TIMEOUT_MS', 0)
+    monkeypatch.setattr(settings, 'DB_ROUTE_TIMEOUTS_MS', {})
+
+    assert request_budget_ms(make_request('read_books')) is None
+
+def test_cancelled_statement_becomes_gateway_timeout():
+    """Test that Postgres query_canceled errors answer 504."""
+    error = OperationalError('SELECT ...', {}, SimpleNamespace(pgcode='57014'))
+
+    response = asyncio.run(statement_timeout_handler(make_request('read_books'), error))
+
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+
+def test_other_database_errors_are_not_converted():
+    """Test that unrelated database errors are re-raised."""
+    error = OperationalError('SELECT ...', {}, SimpleNamespace(pgcode='08006'))
+
+    with pytest.raises(OperationalError):
+        asyncio.run(statement_timeout_handler(make_request('read_books'), error))
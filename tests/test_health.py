@@ -0,0 +1,69 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.core.database import PoolStats
+from app.core.health import HealthMonitor, health_monitor
+
+
+@pytest.fixture
+def monitor(session):
+    """A monitor over the testing database, checked once."""
+    monitor = HealthMonitor(session.get_bind(), PoolStats(), interval=5, max_pool_wait=0.1)
+    monitor.check()
+    return monitor
+
+
+def test_liveness_does_not_need_the_database(client):
+    """Test that /health/live always answers."""
+    response = client.get('/health/live')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'status': 'alive'}
+
+def test_ready_after_a_successful_check(monitor):
+    """Test that a fresh successful check means ready."""
+    ready, details = monitor.readiness()
+
+    assert ready
+    assert details['database'] == 'ok'
+
+def test_not_ready_when_the_database_is_down():
+    """Test that a failed check takes the worker out of rotation."""
+    unreachable = create_engine('sqlite:////nonexistent/dir/madr.db')
+    monitor = HealthMonitor(unreachable, PoolStats())
+
+    monitor.check()
+    ready, details = monitor.readiness()
+
+    assert not ready
+    assert details['database'] == 'unavailable'
+    assert details['problems'][0].startswith('database unavailable')
+
+def test_not_ready_when_the_check_is_stale(monitor):
+    """Test that a monitor that stopped checking does not report ready."""
+    monitor.checked_at = time.monotonic() - 3 * monitor.interval - 1
+
+    assert monitor.readiness()[1]['problems'] == ['database check is stale']
+
+def test_not_ready_while_the_pool_is_saturated(monitor):
+    """Test that slow pool checkouts make the worker not ready."""
+    monitor.pool_stats.checkout_started()
+    monitor.pool_stats.average_wait = 1.0
+
+    assert monitor.readiness()[1]['problems'] == ['connection pool saturated']
+
+def test_ready_endpoint_uses_the_cached_state(client, session, monkeypatch):
+    """Test the status codes of /health/ready."""
+    monkeypatch.setattr(health_monitor, 'engine', session.get_bind())
+    health_monitor.check()
+
+    assert client.get('/health/ready').status_code == HTTPStatus.OK
+
+    monkeypatch.setattr(health_monitor, 'database_ok', False)
+    response = client.get('/health/ready')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json()['status'] == 'not ready'
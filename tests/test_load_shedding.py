@@ -0,0 +1,133 @@
+import time
+from http import HTTPStatus
+from threading import Event, Thread
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.database import PoolStats, TimedQueuePool
+from app.core.jwt import create_access_token
+from app.core.load_shedding import LoadSheddingMiddleware
+
+
+def make_client(pool_stats: PoolStats | None = None, **options) -> tuple[TestClient, LoadSheddingMiddleware]:
+    """Wrap a trivial app with the middleware and return a client and the middleware."""
+    async def ok(request):
+        return PlainTextResponse('ok')
+
+    inner = Starlette(routes=[Route('/{path:path}', ok, methods=['GET', 'POST'])])
+    middleware = LoadSheddingMiddleware(inner, pool_stats or PoolStats(), **options)
+
+    return TestClient(middleware), middleware
+
+
+def bearer() -> dict:
+    return {'Authorization': f'Bearer {create_access_token({"sub": "1"})}'}
+
+
+def test_requests_under_the_limit_pass():
+    """Test that requests are served while the worker has capacity."""
+    client, middleware = make_client(max_in_flight=2)
+
+    assert client.get('/books/').status_code == HTTPStatus.OK
+    assert middleware.in_flight == 0
+
+def test_excess_reads_are_rejected_with_retry_after():
+    """Test that a saturated worker answers 503 with Retry-After."""
+    client, middleware = make_client(max_in_flight=2, retry_after=3)
+    middleware.in_flight = 2
+
+    response = client.get('/books/')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '3'
+    assert middleware.shed == 1
+
+def test_health_is_never_shed():
+    """Test that probes are answered under overload."""
+    client, middleware = make_client(max_in_flight=1)
+    middleware.in_flight = 10
+
+    assert client.get('/health/').status_code == HTTPStatus.OK
+
+def test_authenticated_writes_use_the_reserve():
+    """Test that authenticated writes are admitted where reads are shed."""
+    client, middleware = make_client(max_in_flight=2, write_reserve=1)
+    middleware.in_flight = 2
+
+    assert client.get('/books/').status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert client.post('/books/').status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert client.post('/books/', headers=bearer()).status_code == HTTPStatus.OK
+
+    middleware.in_flight = 3
+    assert client.post('/books/', headers=bearer()).status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+def test_invalid_tokens_are_shed_like_anonymous_writes():
+    """Test that a bogus or malformed token does not buy a priority slot."""
+    stats = PoolStats()
+    client, middleware = make_client(stats, max_in_flight=2, write_reserve=1)
+    middleware.in_flight = 2
+
+    for authorization in ('Bearer not-a-jwt', f'Basic {bearer()["Authorization"].split()[1]}', 'Bearer'):
+        assert client.post('/books/', headers={'Authorization': authorization}).status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    middleware.in_flight = 0
+    stats.checkout_started()
+    stats.average_wait = 0.5
+
+    assert client.post('/books/', headers={'Authorization': 'Bearer not-a-jwt'}).status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+def test_reads_are_shed_while_the_pool_is_saturated():
+    """Test that slow pool checkouts shed reads but not authenticated writes."""
+    stats = PoolStats()
+    client, _ = make_client(stats, max_in_flight=10, max_pool_wait=0.1)
+
+    stats.checkout_started()
+    stats.average_wait = 0.5
+
+    assert client.get('/books/').status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert client.post('/books/', headers=bearer()).status_code == HTTPStatus.OK
+
+    stats.checkout_finished(0.5) # Nobody waits any more
+    assert client.get('/books/').status_code == HTTPStatus.OK
+
+def test_disabled_when_limit_is_zero():
+    """Test that LOAD_SHED_MAX_IN_FLIGHT=0 turns shedding off."""
+    client, middleware = make_client(max_in_flight=0)
+    middleware.in_flight = 1000
+
+    assert client.get('/books/').status_code == HTTPStatus.OK
+
+def test_timed_pool_reports_checkout_waits(tmp_path):
+    """Test that callers blocked on an exhausted pool are counted and timed."""
+    stats = PoolStats(smoothing=1.0)
+    engine = create_engine(
+        f'sqlite:///{tmp_path / "pool.db"}',
+        poolclass=TimedQueuePool,
+        stats=stats,
+        pool_size=1,
+        max_overflow=0,
+    )
+    held = engine.connect()
+    checked_out = Event()
+
+    def waiter():
+        with engine.connect():
+            checked_out.set()
+
+    thread = Thread(target=waiter)
+    thread.start()
+
+    while stats.waiting == 0:
+        time.sleep(0.001) # Until the second checkout blocks
+
+    held.close()
+    thread.join(5)
+
+    assert checked_out.is_set()
+    assert stats.waiting == 0
+    assert stats.average_wait > 0
+    engine.dispose()
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+from prometheus_client import REGISTRY
+
+from app.core.metrics import route_template
+
+
+def sample(name: str, **labels: str) -> float:
+    """Current value of a sample in this process, 0 before its first observation."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def run_worker(directory, code: str) -> str:
+    """Run `code` in a fresh interpreter sharing the multiprocess directory, like a worker."""
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(directory)}
+    result = subprocess.run(
+        [sys.executable, '-c', f'from app.core.metrics import *\n{code}'],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def test_route_template_falls_back_for_unmatched_paths():
+    """Test that paths no route matched share one label value."""
+    assert route_template({'type': 'http', 'path': '/nope/123'}) == 'unmatched'
+
+def test_requests_are_labelled_by_route_template(client, book):
+    """Test that requests for different ids share one series."""
+    labels = {'method': 'GET', 'route': '/books/{book_id}', 'status': '200'}
+    before = sample('madr_http_requests_total', **labels)
+
+    client.get(f'/books/{book.id}')
+    client.get(f'/books/{book.id}?fields=title')
+
+    assert sample('madr_http_requests_total', **labels) == before + 2
+
+    text = client.get('/metrics').text
+
+    assert f'route="/books/{book.id}"' not in text
+    assert 'madr_http_request_duration_seconds_bucket{le="0.005",method="GET",route="/books/{book_id}"}' in text
+
+def test_queries_are_counted_per_request(client, book):
+    """Test that statements run by a request are attributed to its route."""
+    before = sample('madr_db_queries_per_request_count', route='/books/{book_id}')
+
+    assert client.get(f'/books/{book.id}').status_code == HTTPStatus.OK
+
+    assert sample('madr_db_queries_per_request_count', route='/books/{book_id}') == before + 1
+
+def test_auth_operations_are_timed(client, token):
+    """Test that bcrypt and JWT operations are recorded."""
+    assert sample('madr_auth_duration_seconds_count', operation='bcrypt_verify') >= 1
+    assert sample('madr_auth_duration_seconds_count', operation='jwt_encode') >= 1
+
+def test_metrics_exposes_pool_gauges(client):
+    """Test that the endpoint answers in the text format with the pool state."""
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert '# TYPE madr_db_pool_checked_out gauge' in response.text
+
+def test_multiprocess_metrics_sum_every_worker(tmp_path):
+    """Test that any worker answers a scrape with the totals of all workers, exited ones included."""
+    for count in (3, 2):
+        run_worker(tmp_path, f"http_requests.labels('GET', '/books/', '200').inc({count})")
+
+    text = run_worker(tmp_path, 'print(render_metrics().decode())')
+
+    assert 'madr_http_requests_total{method="GET",route="/books/",status="200"} 5.0' in text
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+from sqlalchemy import insert
+
+from app.core.negative_cache import MissingIds
+from app.models.book import Book
+from app.models.romancist import Romancist
+
+
+class CountingSession:
+    """Stand-in session returning a fixed value and counting queries."""
+    def __init__(self, value):
+        self.value = value
+        self.queries = 0
+
+    def scalar(self, statement):
+        self.queries += 1
+        return self.value
+
+
+def test_ids_above_max_id_skip_the_lookup():
+    """Test that ids above max(id) are answered from max(id), confirmed once when cached."""
+    missing = MissingIds(ttl=5, max_entries=10, range_filter=True, range_refresh=60)
+    db = CountingSession(10)
+
+    assert missing.is_missing(db, Book, 11)
+    assert missing.is_missing(db, Book, 11)
+    assert missing.is_missing(db, Book, 0)
+    assert db.queries == 1 # max(id) was just read; the repeat hits the LRU
+
+    assert missing.is_missing(db, Book, 500)
+    assert db.queries == 2 # The cached max(id) is re-read before answering
+
+def test_rows_inserted_outside_the_app_are_found(client, session, romancist):
+    """Test that rows written by Core/SQL, without record_change, are not reported missing."""
+    assert client.get('/books/2').status_code == HTTPStatus.NOT_FOUND # Caches max(id) = 0
+
+    session.execute(insert(Book).values(title='Helena', year=1876, romancist_id=romancist.id)) # e.g. COPY or psql
+    session.commit()
+
+    assert client.get('/books/1').status_code == HTTPStatus.OK
+
+def test_missing_ids_are_remembered_and_forgotten():
+    """Test that a miss is cached and that a committed write clears it."""
+    missing = MissingIds(ttl=5, max_entries=10, range_filter=False, range_refresh=60)
+    db = CountingSession(None)
+
+    assert missing.get(db, Romancist, 3) is None
+    assert missing.get(db, Romancist, 3) is None
+    assert db.queries == 1
+
+    missing.forget('romancists', (3,))
+
+    assert not missing.is_missing(db, Romancist, 3)
+
+def test_created_book_is_found_after_missing_lookup(client, token: str, romancist):
+    """Test that an insert invalidates the negative cache for its id."""
+    assert client.get('/books/1').status_code == HTTPStatus.NOT_FOUND
+
+    response = client.post(
+        '/books/',
+        json={'title': 'Iaiá Garcia', 'year': 1878, 'romancist_id': romancist.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    book_id = response.json()['id']
+
+    assert client.get(f'/books/{book_id}').status_code == HTTPStatus.OK
@@ -0,0 +1,43 @@
+import json
+import multiprocessing
+
+from app.core.changes import change_counter
+from app.core.notify import ChangeListener
+
+
+def test_listener_applies_changes_from_other_workers():
+    """Test that a notification from another worker bumps the resource version."""
+    listener = ChangeListener(engine=None, channel='madr_changes')
+    version = change_counter.version('romancists')
+
+    listener._handle(json.dumps({'origin': 'another', 'resource': 'romancists', 'ids': [1]}))
+
+    assert change_counter.version('romancists') == version + 1
+
+def test_listener_skips_its_own_changes():
+    """Test that notifications sent by this worker are not applied twice."""
+    listener = ChangeListener(engine=None, channel='madr_changes')
+    version = change_counter.version('romancists')
+
+    listener._handle(json.dumps({'origin': change_counter.epoch, 'resource': 'romancists', 'ids': [1]}))
+    listener._handle('not json')
+
+    assert change_counter.version('romancists') == version
+
+
+def _current_epoch() -> str:
+    return change_counter.epoch
+
+def test_forked_workers_apply_each_others_changes():
+    """Test that workers forked from one preloaded process do not share an epoch."""
+    with multiprocessing.get_context('fork').Pool(1) as worker:
+        worker_epoch = worker.apply(_current_epoch)
+
+    assert worker_epoch != change_counter.epoch
+
+    listener = ChangeListener(engine=None, channel='madr_changes')
+    version = change_counter.version('romancists')
+
+    listener._handle(json.dumps({'origin': worker_epoch, 'resource': 'romancists', 'ids': [1]}))
+
+    assert change_counter.version('romancists') == version + 1
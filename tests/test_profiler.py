@@ -0,0 +1,84 @@
+import time
+from http import HTTPStatus
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiler import ProfilingMiddleware, SamplingProfiler, is_authorized, profile_for
+from app.routers import profiling
+
+
+def busy_loop(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def make_client(secret: str = 's3cret') -> TestClient:
+    app = FastAPI()
+
+    @app.get('/slow')
+    def slow():
+        busy_loop(0.05)
+        return {'ok': True}
+
+    app.add_middleware(ProfilingMiddleware, secret=secret)
+    app.include_router(profiling.router)
+
+    return TestClient(app)
+
+
+def test_profiler_outputs_folded_stacks():
+    """Test that samples are aggregated as `root;...;leaf count` lines."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy_loop(0.05)
+    profiler.stop()
+
+    lines = profiler.folded().splitlines()
+
+    assert profiler.samples > 0
+    assert any('busy_loop (tests/test_profiler.py' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+def test_authorization_requires_a_configured_secret():
+    """Test that an empty secret never authorizes."""
+    assert is_authorized('s3cret', 's3cret')
+    assert not is_authorized('wrong', 's3cret')
+    assert not is_authorized('', '')
+    assert not is_authorized(None, 's3cret')
+
+def test_requests_without_token_are_not_profiled():
+    """Test that ordinary requests pass through untouched."""
+    response = make_client().get('/slow')
+
+    assert response.json() == {'ok': True}
+    assert 'x-profiled-status' not in response.headers
+
+def test_request_with_token_returns_its_profile():
+    """Test that a request carrying the token answers with its folded stacks."""
+    response = make_client().get('/slow', headers={'X-Profile-Token': 's3cret'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['x-profiled-status'] == '200'
+    assert 'slow (tests/test_profiler.py' in response.text
+
+def test_window_profile_requires_token(monkeypatch):
+    """Test that /debug/profile is refused without the secret."""
+    monkeypatch.setattr(settings, 'PROFILING_SECRET', 's3cret')
+    client = make_client()
+
+    assert client.get('/debug/profile?seconds=0.01').status_code == HTTPStatus.FORBIDDEN
+
+    response = client.get('/debug/profile?seconds=0.05', headers={'X-Profile-Token': 's3cret'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert int(response.headers['x-profile-samples']) > 0
+
+def test_profile_for_samples_the_window():
+    """Test that the window profiler runs for the requested time."""
+    started = time.perf_counter()
+    profiler = profile_for(0.05, interval=0.001)
+
+    assert time.perf_counter() - started >= 0.05
+    assert profiler.samples > 0
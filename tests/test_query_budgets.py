@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+
+from app.models.book import Book
+from app.models.romancist import Romancist
+from app.models.user import User
+
+
+# Maximum SQL statements per endpoint on a cold cache, including the user
+# lookup of authenticated routes. Reads by id also load the negative cache's
+# max id once. Raise a budget only with a reason.
+QUERY_BUDGETS = {
+    'login': 1,
+    'refresh_token': 1,
+    'read_users_me': 1,
+    'create_user': 3,
+    'read_user': 2,
+    'update_user': 4,
+    'delete_user': 3,
+    'create_book': 6,
+    'read_book': 2,
+    'read_books': 2,
+    'update_book': 4,
+    'delete_book': 3,
+    'create_romancist': 4,
+    'read_romancist': 2,
+    'read_romancists': 2,
+    'update_romancist': 4,
+    'delete_romancist': 5,
+}
+
+# Generous wall-clock ceilings that only catch pathological slowdowns, enforced
+# only with QUERY_TIME_BUDGETS=1 (timings are too noisy for every run)
+TIME_BUDGET_MS = 500
+LOGIN_TIME_BUDGET_MS = 2000 # bcrypt verification is deliberately slow
+
+
+def requests_for(user: User, book: Book, romancist: Romancist) -> dict:
+    """Endpoint name -> (method, path, request kwargs, expected status)."""
+    return {
+        'login': ('POST', '/auth/token', {'data': {'username': user.email, 'password': 'mysecretpassword'}}, HTTPStatus.OK),
+        'refresh_token': ('POST', '/auth/refresh_token', {}, HTTPStatus.OK),
+        'read_users_me': ('GET', '/users/me', {}, HTTPStatus.OK),
+        'create_user': ('POST', '/users/', {'json': {'username': 'budget', 'email': 'budget@test.com', 'password': 'secret123'}}, HTTPStatus.CREATED),
+        'read_user': ('GET', f'/users/{user.id}', {}, HTTPStatus.OK),
+        'update_user': ('PUT', f'/users/{user.id}', {'json': {'username': 'renamed'}}, HTTPStatus.OK),
+        'delete_user': ('DELETE', f'/users/{user.id}', {}, HTTPStatus.OK),
+        'create_book': ('POST', '/books/', {'json': {'title': 'New Book', 'year': 2020, 'romancist_id': romancist.id}}, HTTPStatus.CREATED),
+        'read_book': ('GET', f'/books/{book.id}', {}, HTTPStatus.OK),
+        'read_books': ('GET', '/books/', {'params': {'titulo': 'test'}}, HTTPStatus.OK),
+        'update_book': ('PUT', f'/books/{book.id}', {'json': {'year': 2001}}, HTTPStatus.OK),
+        'delete_book': ('DELETE', f'/books/{book.id}', {}, HTTPStatus.OK),
+        'create_romancist': ('POST', '/romancists/', {'json': {'name': 'New Romancist'}}, HTTPStatus.CREATED),
+        'read_romancist': ('GET', f'/romancists/{romancist.id}', {}, HTTPStatus.OK),
+        'read_romancists': ('GET', '/romancists/', {'params': {'nome': 'test'}}, HTTPStatus.OK),
+        'update_romancist': ('PUT', f'/romancists/{romancist.id}', {'json': {'name': 'Renamed Romancist'}}, HTTPStatus.OK),
+        'delete_romancist': ('DELETE', f'/romancists/{romancist.id}', {}, HTTPStatus.OK),
+    }
+
+
+@pytest.mark.parametrize('endpoint', QUERY_BUDGETS)
+def test_endpoint_query_budget(client, query_budget, token: str, user: User, book: Book, endpoint: str):
+    """Each endpoint stays within its declared number of statements."""
+    method, path, kwargs, expected_status = requests_for(user, book, book.romancist)[endpoint]
+    time_budget = LOGIN_TIME_BUDGET_MS if endpoint == 'login' else TIME_BUDGET_MS
+
+    with query_budget(QUERY_BUDGETS[endpoint], max_ms=time_budget):
+        response = client.request(method, path, headers={'Authorization': f'Bearer {token}'}, **kwargs)
+
+    assert response.status_code == expected_status
+
+
+def test_query_budget_reports_excess_statements(client, query_budget, book: Book):
+    """A block over budget fails with the statements it ran."""
+    with pytest.raises(pytest.fail.Exception, match=r'queries ran, budget is 0:\n  1\. SELECT'):
+        with query_budget(0):
+            client.get(f'/books/{book.id}')
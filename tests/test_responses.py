@@ -0,0 +1,35 @@
+import pytest
+
+from app.utils import responses
+from app.utils.responses import dumps, encode_rows
+
+CONTENT = [
+    {'books': []},
+    {'detail': 'Book not found'},
+    {'title': 'Dom Casmurro', 'year': 1899, 'romancist_id': 1},
+    {'name': 'José de Alencar', 'quote': 'Ela disse: "olá"\n\t\\fim', 'control': '\x00\x1f\x7f'},
+    {'emoji': '📚', 'cjk': '書', 'separators': '  ', 'slash': '</script>'},
+    {'nested': {'ids': [1, -2, 2**53], 'flags': [True, False, None]}, 'empty': {}},
+    {'ratio': 0.1, 'half': 0.5, 'big': 123456.789, 'negative': -3.0},
+]
+
+
+@pytest.mark.parametrize('content', CONTENT)
+def test_orjson_and_stdlib_encoders_produce_identical_bytes(monkeypatch, content):
+    assert responses.orjson is not None, 'orjson is a declared dependency'
+
+    fast = dumps(content)
+
+    monkeypatch.setattr(responses, 'orjson', None)
+
+    assert dumps(content) == fast
+
+
+def test_encode_rows_is_identical_without_orjson(monkeypatch):
+    rows = [(1, 'Memórias Póstumas', 1881), (2, 'Iracema', 1865)]
+    fast = encode_rows('books', ('id', 'title', 'year'), rows)
+
+    monkeypatch.setattr(responses, 'orjson', None)
+
+    assert encode_rows('books', ('id', 'title', 'year'), rows) == fast
+    assert fast == '{"books":[{"id":1,"title":"Memórias Póstumas","year":1881},{"id":2,"title":"Iracema","year":1865}]}'.encode()
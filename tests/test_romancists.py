@@ -1,8 +1,11 @@
 from http import HTTPStatus
 
+from app.models.book import Book
 from app.models.romancist import Romancist
 from app.schemas.romancist import RomancistCreate, RomancistResponse, RomancistUpdate, RomancistList
 from app.utils.sanitize import sanitize_name
+from app.core.cache import response_cache
+from app.core.config import settings
 
 from pprint import pprint
 
@@ -180,3 +183,89 @@ def test_delete_romancist_not_found(client, romancist: Romancist, token: str):
     data = response.json()
     assert data['detail'] == 'Romancist is not listed in MADR'
 
+
+def test_create_romancist_keeps_display_casing(client, token: str):
+    """Test that the name keeps its casing while duplicates are matched by key."""
+    response = client.post(
+        '/romancists/',
+        json={'name': 'Machado  de Assis'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['name'] == 'Machado de Assis'
+
+    response = client.post(
+        '/romancists/',
+        json={'name': 'machado de assis'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+def test_read_romancist_not_modified(client, romancist: Romancist):
+    """Test that a matching If-None-Match returns 304 for a romancist."""
+    etag = client.get(f'/romancists/{romancist.id}').headers['ETag']
+
+    response = client.get(f'/romancists/{romancist.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+def test_delete_romancist_changes_books_etag(client, token: str, book: Book):
+    """Test that deleting a romancist invalidates book ETags (cascade)."""
+    etag = client.get('/books/').headers['ETag']
+
+    client.delete(
+        f'/romancists/{book.romancist_id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    response = client.get('/books/', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['books'] == []
+
+def test_read_romancists_fast_path_matches_orm_path(client, session, romancists: RomancistList, monkeypatch):
+    """Test that the fast list path produces the same bytes as the Pydantic path."""
+    bodies = {}
+    for mode in ('orm', 'fast'):
+        monkeypatch.setattr(settings, 'ROMANCISTS_LIST_MODE', mode)
+        response_cache.clear()
+        bodies[mode] = client.get('/romancists/').content
+
+    assert bodies['fast'] == bodies['orm']
+
+def test_read_romancists_db_json_matches_orm_path(client, session, romancists: RomancistList, monkeypatch):
+    """Test that the database-built body holds the same data as the Pydantic path."""
+    bodies = {}
+    for mode in ('orm', 'db_json'):
+        monkeypatch.setattr(settings, 'ROMANCISTS_LIST_MODE', mode)
+        response_cache.clear()
+        bodies[mode] = client.get('/romancists/?nome=romancist').json()
+
+    assert bodies['db_json'] == bodies['orm']
+
+def test_read_romancists_sparse_fields(client, romancists: RomancistList):
+    """Test that ?fields=id returns only the ids of the romancists."""
+    response = client.get('/romancists/?fields=id')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'romancists': [{'id': romancist.id} for romancist in romancists]}
+
+def test_read_romancists_by_ids(client, token: str, romancists: RomancistList):
+    """Test that ?ids returns romancists in request order and finds ids created afterwards."""
+    first, second, third = (romancist.id for romancist in romancists)
+
+    response = client.get(f'/romancists/?ids={third},{first},{third + 1}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'romancists': [{'id': third, 'name': romancists[2].name}, {'id': first, 'name': romancists[0].name}],
+        'missing': [third + 1],
+    }
+
+    client.post('/romancists/', json={'name': 'Romancist Four'}, headers={'Authorization': f'Bearer {token}'})
+
+    response = client.get(f'/romancists/?ids={third + 1}')
+
+    assert response.json() == {'romancists': [{'id': third + 1, 'name': 'Romancist Four'}], 'missing': []}
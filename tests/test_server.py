@@ -0,0 +1,20 @@
+from app.server import MadrApplication, RecyclingUvicornWorker, available_cores, load_config
+
+
+def test_load_config_resolves_auto_workers(tmp_path):
+    config_file = tmp_path / 'server.toml'
+    config_file.write_text('[server]\nbind = "127.0.0.1:9000"\nworkers = "auto"\nmax_requests = 100\n')
+
+    config = load_config(config_file)
+
+    assert config['workers'] == available_cores()
+    assert config['max_requests'] == 100
+
+
+def test_application_applies_config(tmp_path):
+    application = MadrApplication({'bind': '127.0.0.1:9000', 'workers': 3, 'max_worker_memory_mb': 256})
+
+    assert application.cfg.workers == 3
+    assert application.cfg.bind == ['127.0.0.1:9000']
+    assert application.cfg.worker_class is RecyclingUvicornWorker
+    assert RecyclingUvicornWorker.max_memory_mb == 256
@@ -0,0 +1,70 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import QueryStats, RepeatedQueryError, current_queries, normalize_sql
+from app.models.book import Book
+
+
+@pytest.fixture
+def tracked():
+    """Attribute statements run by the test to a fresh QueryStats."""
+    stats = QueryStats()
+    token = current_queries.set(stats)
+    yield stats
+    current_queries.reset(token)
+
+
+def test_normalize_sql_hides_values():
+    """Test that statements differing only in values share a shape."""
+    statement = "SELECT * FROM books WHERE title_key = %(key)s AND year = 1999 AND id IN (%(id_1)s, %(id_2)s) AND title = 'x'"
+
+    assert normalize_sql(statement) == 'SELECT * FROM books WHERE title_key = ? AND year = ? AND id IN (...) AND title = ?'
+
+def test_response_reports_database_time(client, book):
+    """Test that responses carry the query count and DB time."""
+    response = client.get(f'/books/{book.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert re.match(r'db;dur=[\d.]+;desc="[1-9]\d* queries", app;dur=[\d.]+$', response.headers['server-timing'])
+
+def test_statements_are_counted(session, book, tracked):
+    """Test that the engine hooks count and time statements of the current request."""
+    session.scalar(select(Book.id))
+    session.scalar(select(Book.title))
+
+    assert tracked.count == 2
+    assert tracked.seconds > 0
+
+def test_repeated_statement_is_reported(session, book, tracked, monkeypatch, caplog):
+    """Test that a statement repeated past the threshold is logged once."""
+    monkeypatch.setattr(settings, 'N_PLUS_ONE_MODE', 'warn')
+    monkeypatch.setattr(settings, 'N_PLUS_ONE_THRESHOLD', 3)
+
+    with caplog.at_level(logging.WARNING, logger='app.core.database'):
+        for id in range(5):
+            session.scalar(select(Book).where(Book.id == id))
+
+    assert len([record for record in caplog.records if 'possible N+1' in record.message]) == 1
+
+def test_repeated_statement_raises_in_raise_mode(session, book, tracked, monkeypatch):
+    """Test that N_PLUS_ONE_MODE='raise' fails the request."""
+    monkeypatch.setattr(settings, 'N_PLUS_ONE_MODE', 'raise')
+    monkeypatch.setattr(settings, 'N_PLUS_ONE_THRESHOLD', 3)
+
+    with pytest.raises(RepeatedQueryError):
+        for id in range(3):
+            session.scalar(select(Book).where(Book.id == id))
+
+def test_slow_queries_are_logged_with_their_shape(session, book, monkeypatch, caplog):
+    """Test that statements above SLOW_QUERY_MS are logged normalized."""
+    monkeypatch.setattr(settings, 'SLOW_QUERY_MS', 0.000001)
+
+    with caplog.at_level(logging.WARNING, logger='app.slow_queries'):
+        session.scalar(select(Book).where(Book.title_key == 'test book'))
+
+    assert any('books.title_key = ?' in record.message for record in caplog.records)
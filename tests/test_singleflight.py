@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+
+from app.core.cache import MemoryBackend, ResponseCache
+from app.core.singleflight import SingleFlight
+
+
+def run_concurrently(flights: SingleFlight, key: str, fn, callers: int = 5) -> list:
+    """Call `flights.do(key, fn)` from several threads and return their futures."""
+    executor = ThreadPoolExecutor(max_workers=callers)
+    futures = [executor.submit(flights.do, key, fn) for _ in range(callers)]
+    executor.shutdown(wait=False)
+    return futures
+
+def wait_for_followers(seconds: float = 0.2):
+    time.sleep(seconds) # Give every caller time to join the in-flight call
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that identical concurrent calls run the function once and share the result."""
+    flights = SingleFlight(timeout=5)
+    release = Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return b'body'
+
+    futures = run_concurrently(flights, 'books:x', load)
+    wait_for_followers()
+    release.set()
+
+    assert [future.result(5) for future in futures] == [b'body'] * 5
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+def test_different_keys_are_not_coalesced():
+    """Test that calls with different keys run independently."""
+    flights = SingleFlight(timeout=5)
+
+    assert flights.do('books:a', lambda: 'a') == 'a'
+    assert flights.do('books:b', lambda: 'b') == 'b'
+
+def test_leader_error_is_propagated_to_followers():
+    """Test that waiting callers get the leader's exception instead of retrying."""
+    flights = SingleFlight(timeout=5)
+    release = Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError('boom')
+
+    futures = run_concurrently(flights, 'books:x', load, callers=3)
+    wait_for_followers()
+    release.set()
+
+    for future in futures:
+        with pytest.raises(ValueError, match='boom'):
+            future.result(5)
+
+    assert len(calls) == 1
+
+def test_followers_run_the_call_themselves_after_timeout():
+    """Test that a stuck leader does not block followers past the timeout."""
+    flights = SingleFlight(timeout=0.1)
+    release = Event()
+
+    def slow():
+        release.wait(5)
+        return 'leader'
+
+    leader = run_concurrently(flights, 'books:x', slow, callers=1)[0]
+    wait_for_followers(0.05)
+
+    assert flights.do('books:x', lambda: 'follower') == 'follower'
+
+    release.set()
+    assert leader.result(5) == 'leader'
+
+def test_response_cache_coalesces_concurrent_misses():
+    """Test that a herd of misses on the same key loads the body once."""
+    cache = ResponseCache(MemoryBackend(), ttl=30, stale=0, coalesce=SingleFlight(timeout=5))
+    release = Event()
+    calls = []
+
+    def loader(db):
+        calls.append(db)
+        release.wait(5)
+        return b'{}'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.fetch, 'books:read_book?id=1', loader, None) for _ in range(8)]
+        wait_for_followers()
+        release.set()
+
+        assert all(future.result(5) == b'{}' for future in futures)
+
+    assert len(calls) == 1
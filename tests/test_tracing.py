@@ -0,0 +1,116 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.tracing import FileExporter, Span, TracingMiddleware, current_span, parse_traceparent, span, traced, tracer
+
+TRACE_ID = '0af7651916cd43dd8448eb211c80319c'
+PARENT_ID = 'b7ad6b7169203331'
+
+
+class CollectingExporter:
+    """Keeps finished spans in memory."""
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, finished: Span):
+        self.spans.append(finished)
+
+@pytest.fixture
+def exported(monkeypatch):
+    exporter = CollectingExporter()
+    monkeypatch.setattr(tracer, 'exporter', exporter)
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    return exporter.spans
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @traced('load')
+    def load():
+        with span('inner'):
+            return {'ok': True}
+
+    @app.get('/items/{item_id}')
+    def read_item(item_id: int):
+        return load()
+
+    app.add_middleware(TracingMiddleware)
+    return TestClient(app)
+
+
+def test_parse_traceparent():
+    """Test W3C traceparent parsing, including invalid values."""
+    assert parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-01') == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-00') == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent(f'00-{"0" * 32}-{PARENT_ID}-01') is None
+    assert parse_traceparent('garbage') is None
+    assert parse_traceparent(None) is None
+
+def test_span_outside_a_trace_is_a_no_op(exported):
+    """Test that code outside a sampled request records nothing."""
+    with span('orphan') as current:
+        assert current is None
+
+    assert exported == []
+
+def test_request_spans_are_nested(exported):
+    """Test that child spans hang under the server span named after the route."""
+    response = make_client().get('/items/1')
+
+    names = {item.name: item for item in exported}
+
+    assert set(names) == {'inner', 'load', 'GET /items/{item_id}'}
+    assert names['inner'].parent_id == names['load'].span_id
+    assert names['load'].parent_id == names['GET /items/{item_id}'].span_id
+    assert names['GET /items/{item_id}'].attributes['http.status_code'] == 200
+    assert response.headers['traceresponse'].startswith(f'00-{names["load"].trace_id}-')
+
+def test_incoming_trace_is_continued(exported):
+    """Test that a sampled traceparent sets the trace id and parent."""
+    make_client().get('/items/1', headers={'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-01'})
+
+    server = next(item for item in exported if item.name.startswith('GET'))
+
+    assert {item.trace_id for item in exported} == {TRACE_ID}
+    assert server.parent_id == PARENT_ID
+
+def test_unsampled_requests_record_nothing(exported, monkeypatch):
+    """Test the sampling decision, with and without an incoming traceparent."""
+    monkeypatch.setattr(tracer, 'sample_rate', 0.0)
+    client = make_client()
+
+    response = client.get('/items/1')
+    client.get('/items/1', headers={'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-00'})
+
+    assert exported == []
+    assert 'traceresponse' not in response.headers
+
+def test_errors_are_recorded_on_the_span(exported):
+    """Test that an exception marks the span as failed."""
+    root = Span('root', TRACE_ID, None)
+    token = current_span.set(root)
+
+    with pytest.raises(ValueError):
+        with span('failing'):
+            raise ValueError
+
+    current_span.reset(token)
+
+    assert exported[0].error == 'ValueError'
+    assert exported[0].to_otlp()['status']['code'] == 2
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    """Test that spans are appended one JSON object per line."""
+    path = tmp_path / 'traces.jsonl'
+    finished = Span('work', TRACE_ID, PARENT_ID, rows=3)
+    finished.end_ns = finished.start_ns + 1000
+
+    FileExporter(str(path)).send([finished, finished], 'madr-api')
+
+    lines = path.read_text().splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0])['attributes'] == [{'key': 'rows', 'value': {'intValue': '3'}}]
@@ -166,4 +166,12 @@ def test_delete_user_unauthorized(client, user: User):
 
     data = response.json()
 
-    assert data['detail'] == 'Not authenticated'
\ No newline at end of file
+    assert data['detail'] == 'Not authenticated'
+
+
+def test_read_user_sparse_fields(client, user: User):
+    """Test that ?fields limits the user payload."""
+    response = client.get(f'/users/{user.id}?fields=username')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'username': user.username}